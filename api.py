@@ -0,0 +1,331 @@
+"""Lightweight async HTTP API for taking quizzes without the Streamlit UI.
+
+Uses the same storage backend, quiz catalog, grading engine and attempt store as
+main.py, so the same rules apply: one timed attempt per student and quiz. Starting
+an attempt returns the questions and the deadline; a submission is accepted once,
+and only until the deadline plus a short grace period.
+
+    python api.py --host 127.0.0.1 --port 8000
+
+Endpoints:
+    GET  /quizzes                         quizzes currently available to students
+    GET  /quizzes/{quiz_id}               one available quiz's details, without its questions
+    POST /quizzes/{quiz_id}/attempts      {"student_id": "..."}: starts (or resumes) the timed attempt
+    POST /quizzes/{quiz_id}/submissions   {"student_id": "...", "answers": {"0": "A", ...}}
+"""
+import argparse
+import asyncio
+import json
+import time as python_time
+import traceback
+from datetime import datetime
+from http import HTTPStatus
+
+from dotenv import load_dotenv
+
+import attempt_store
+import grading
+import quiz_catalog
+import storage
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_SIZE = 1000 # Submissions written per storage call
+SUBMISSION_QUEUE_SIZE = 50000 # Beyond this, submits get 503 instead of queueing without bound
+CATALOG_REFRESH_SECONDS = 1.0 # How often quiz changes made elsewhere are picked up
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def quiz_summary(quiz_id, quiz):
+    return {
+        "quiz_id": quiz_id,
+        "title": quiz.get('title'),
+        "duration": quiz.get('duration'),
+        "start_date": quiz.get('start_date'),
+        "start_time": quiz.get('start_time'),
+        "end_date": quiz.get('end_date'),
+        "end_time": quiz.get('end_time'),
+        "num_questions": len(quiz.get('questions', [])),
+    }
+
+
+def public_quiz(quiz_id, quiz):
+    """Returns a quiz as students may see it: everything except the correct answers."""
+    summary = quiz_summary(quiz_id, quiz)
+    summary["questions"] = [
+        {"question_text": q.get('question_text'), "options": dict(q.get('options', {}))}
+        for q in quiz.get('questions', [])
+    ]
+    return summary
+
+
+def blocking(function, *args):
+    """Runs a blocking storage call in the default thread pool, off the event loop."""
+    return asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+def json_object(body):
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be JSON.")
+    if not isinstance(payload, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+    return payload
+
+
+def student_id_from(payload):
+    student_id = payload.get('student_id')
+    if not isinstance(student_id, str) or not student_id.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'student_id' must be a non-empty string.")
+    return student_id
+
+
+class QuizAPI:
+    def __init__(self, backend, attempts=None):
+        self.backend = backend
+        self.attempts = attempts if attempts is not None else attempt_store.create_attempt_store()
+        self.queue = None
+        self.writer_task = None
+        self.catalog_task = None
+        self._catalog = None
+        self._submitting = set() # (student_id, quiz_id) of submissions being stored right now
+
+    # --- Data access ---
+    def load_catalog(self):
+        """Blocking: checks the backend's quiz version and rebuilds the catalog if it changed."""
+        return quiz_catalog.get_catalog(self.backend.name, self.backend.quizzes_version(), self.backend.load_quizzes)
+
+    def catalog(self):
+        """Returns the current catalog without touching storage (kept fresh by `refresh_catalog`)."""
+        return self._catalog
+
+    async def refresh_catalog(self):
+        while True:
+            await asyncio.sleep(CATALOG_REFRESH_SECONDS)
+            try:
+                self._catalog = await blocking(self.load_catalog)
+            except Exception:
+                pass # Storage briefly unavailable; keep serving the last catalog
+
+    def quiz(self, quiz_id):
+        quiz = self.catalog().by_id.get(quiz_id)
+        if quiz is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No quiz '{quiz_id}'.")
+        return quiz
+
+    def available_quiz(self, quiz_id):
+        catalog = self.catalog()
+        quiz = catalog.by_id.get(quiz_id)
+        if quiz is None or not catalog.is_available(quiz_id, datetime.now()):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No available quiz '{quiz_id}'.")
+        return quiz
+
+    async def start(self):
+        self._catalog = await blocking(self.load_catalog)
+        self.catalog_task = asyncio.create_task(self.refresh_catalog())
+        self.queue = asyncio.Queue(maxsize=SUBMISSION_QUEUE_SIZE)
+        self.writer_task = asyncio.create_task(self.write_submissions())
+
+    # --- Attempts ---
+    async def start_attempt(self, quiz_id, payload):
+        """Starts the student's attempt (or returns the one already running) with its questions and deadline."""
+        quiz = self.available_quiz(quiz_id)
+        student_id = student_id_from(payload)
+        attempt = await blocking(self.attempts.start, student_id, quiz_id, python_time.time())
+        await self.check_in_progress(quiz, quiz_id, student_id, attempt)
+        result = public_quiz(quiz_id, quiz)
+        result["started_at"] = attempt['started_at']
+        result["deadline"] = attempt['started_at'] + (quiz.get('duration') or 0) * 60
+        return result
+
+    async def check_in_progress(self, quiz, quiz_id, student_id, attempt):
+        """Raises 409 unless `attempt` is still running; an attempt found past its deadline is timed out."""
+        if attempt is None:
+            raise HTTPError(HTTPStatus.CONFLICT, f"Start the quiz first with POST /quizzes/{quiz_id}/attempts.")
+        if attempt['status'] == 'submitted':
+            raise HTTPError(HTTPStatus.CONFLICT, "This quiz has already been submitted.")
+        if attempt['status'] == 'timed_out':
+            raise HTTPError(HTTPStatus.CONFLICT, "Time's up! This quiz was not submitted in time.")
+        if attempt_store.is_overdue(attempt, quiz.get('duration', 0)):
+            await blocking(self.attempts.finish, student_id, quiz_id, 'timed_out')
+            raise HTTPError(HTTPStatus.CONFLICT, "Time's up! The quiz duration has expired.")
+
+    # --- Batching submission writer ---
+    async def write_submissions(self):
+        """Drains queued submissions into the store in batches, off the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < MAX_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            records = [record for record, _ in batch]
+            try:
+                await loop.run_in_executor(None, self.backend.submissions.append_many, records)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+    async def submit(self, quiz_id, payload):
+        # A quiz that closed mid-attempt still accepts that attempt's submission, as in the app.
+        quiz = self.quiz(quiz_id)
+        student_id = student_id_from(payload)
+        answers = payload.get('answers')
+        if not isinstance(answers, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'answers' must be an object of question index to option key.")
+        num_questions = len(quiz.get('questions', []))
+        try:
+            answers = {int(q_num): ans for q_num, ans in answers.items()}
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Answer keys must be question indexes.")
+        if any(not 0 <= q_num < num_questions for q_num in answers):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Question indexes must be between 0 and {num_questions - 1}.")
+        for q_num, ans in answers.items():
+            if not isinstance(ans, str) or ans not in quiz['questions'][q_num].get('options', {}):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Answer to question {q_num} must be one of its option keys.")
+
+        key = (student_id, quiz_id)
+        if key in self._submitting:
+            raise HTTPError(HTTPStatus.CONFLICT, "This attempt is already being submitted.")
+        self._submitting.add(key)
+        try:
+            attempt = await blocking(self.attempts.get, student_id, quiz_id)
+            await self.check_in_progress(quiz, quiz_id, student_id, attempt)
+            return await self.store_submission(quiz, quiz_id, student_id, answers)
+        finally:
+            self._submitting.discard(key)
+
+    async def store_submission(self, quiz, quiz_id, student_id, answers):
+        num_questions = len(quiz.get('questions', []))
+        score = grading.score_answers(quiz, answers)
+        now = python_time.time()
+        submission_record = {
+            "quiz_title": quiz.get('title'),
+            "quiz_id": quiz_id,
+            "student_id": student_id,
+            "answers": answers,
+            "score": score,
+            "total_questions": num_questions,
+            "submission_timestamp": now,
+            "submission_time_str": python_time.strftime("%Y-%m-%d %H:%M:%S", python_time.localtime(now)),
+        }
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((submission_record, future))
+        except asyncio.QueueFull:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many pending submissions; please retry.")
+        await future # Respond only once the batch holding this submission is stored
+        await blocking(self.attempts.finish, student_id, quiz_id, 'submitted', answers, score, num_questions)
+        return {"quiz_id": quiz_id, "score": score, "total_questions": num_questions}
+
+    # --- Routing ---
+    async def route(self, method, path, body):
+        parts = [part for part in path.split('?', 1)[0].split('/') if part]
+        if parts == ['quizzes'] and method == 'GET':
+            catalog = self.catalog()
+            return HTTPStatus.OK, [
+                quiz_summary(quiz_catalog.quiz_id_for(quiz), quiz)
+                for quiz in catalog.available_at(datetime.now())
+            ]
+        if len(parts) == 2 and parts[0] == 'quizzes' and method == 'GET':
+            return HTTPStatus.OK, quiz_summary(parts[1], self.available_quiz(parts[1]))
+        if len(parts) == 3 and parts[0] == 'quizzes' and parts[2] == 'attempts' and method == 'POST':
+            return HTTPStatus.OK, await self.start_attempt(parts[1], json_object(body))
+        if len(parts) == 3 and parts[0] == 'quizzes' and parts[2] == 'submissions' and method == 'POST':
+            return HTTPStatus.CREATED, await self.submit(parts[1], json_object(body))
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}.")
+
+    # --- HTTP/1.1 connection handling ---
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line."}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                length = headers.get('content-length', '0')
+                if not (length.isascii() and length.isdigit()):
+                    # The body can't be delimited, so the rest of the stream can't be parsed either
+                    await self.respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length."}, False)
+                    break
+                length = int(length)
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large."}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, result = await self.route(method.upper(), path, body)
+                except HTTPError as e:
+                    status, result = e.status, {"error": e.message}
+                except Exception:
+                    traceback.print_exc() # Logged on the server; clients don't see internals
+                    status, result = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+                await self.respond(writer, status, result, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, result, keep_alive):
+        payload = json.dumps(result).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode('latin-1')
+        writer.write(head + payload)
+        await writer.drain()
+
+
+async def serve(host, port, quiz_file_path, submissions_file_path):
+    api = QuizAPI(storage.create_backend(quiz_file_path, submissions_file_path))
+    await api.start()
+    server = await asyncio.start_server(api.handle_connection, host, port, backlog=4096)
+    print(f"Serving quiz API on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Serve the quiz HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--quiz-file", default="quiz_data.json")
+    parser.add_argument("--submissions-file", default="quiz_submissions.json")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.quiz_file, args.submissions_file))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60 # In-progress attempts untouched for this long are timed out
+DEFAULT_GC_INTERVAL_SECONDS = 60
+SUBMIT_GRACE_SECONDS = 5 # Allowance for network latency between the client's deadline and the server check
+
+
+def _new_attempt(student_id, quiz_id, started_at):
+    return {
+        "student_id": student_id,
+        "quiz_id": quiz_id,
+        "status": "in_progress",
+        "started_at": started_at,
+        "answers": {},
+        "score": None,
+        "total_questions": None,
+        "updated_at": time.time(),
+    }
+
+
+def seconds_left(attempt, duration_minutes, now=None):
+    """Returns the time left on an attempt of a quiz lasting `duration_minutes` (negative once past it)."""
+    now = time.time() if now is None else now
+    return (duration_minutes or 0) * 60 - (now - attempt["started_at"])
+
+
+def is_overdue(attempt, duration_minutes, now=None):
+    """True once an attempt is past its deadline plus SUBMIT_GRACE_SECONDS; it can only time out then."""
+    return seconds_left(attempt, duration_minutes, now) <= -SUBMIT_GRACE_SECONDS
+
+
+def _tombstone(attempt):
+    """Returns the compact timed-out record kept for an attempt evicted from memory."""
+    return dict(attempt, status="timed_out", answers={})
+
+
+class MemoryAttemptStore:
+    """In-process attempt store: in-progress attempts in an LRU map with TTL eviction.
+
+    An in-progress attempt that expires or is evicted becomes a timed-out tombstone
+    (its answers are dropped), so the student can't start the quiz again with a fresh
+    timer. Finished attempts and tombstones are kept for the life of the process, so
+    memory grows with students x quizzes: this store is for development and
+    short-lived single workers. Use SQLiteAttemptStore for long-running deployments,
+    across restarts, or when several workers share a volume.
+    """
+
+    def __init__(self, max_attempts=10000, ttl_seconds=DEFAULT_TTL_SECONDS, gc_interval=DEFAULT_GC_INTERVAL_SECONDS):
+        self.max_attempts = max_attempts # In-progress attempts kept; the least recently used are timed out beyond this
+        self.ttl_seconds = ttl_seconds
+        self.gc_interval = gc_interval
+        self._attempts = OrderedDict() # (student_id, quiz_id) -> in-progress attempt, least recently used first
+        self._finished = {} # (student_id, quiz_id) -> submitted or timed-out attempt, or tombstone
+        self._lock = threading.Lock()
+        self._last_gc = time.monotonic()
+
+    def _expired(self, attempt, now):
+        return now - attempt["updated_at"] > self.ttl_seconds
+
+    def _lookup(self, key):
+        """Returns the live attempt for `key` and marks it recently used. Caller holds the lock."""
+        attempt = self._finished.get(key)
+        if attempt is not None:
+            return attempt
+        attempt = self._attempts.get(key)
+        if attempt is None:
+            return None
+        if self._expired(attempt, time.time()):
+            return self._time_out(key)
+        self._attempts.move_to_end(key)
+        return attempt
+
+    def _time_out(self, key):
+        """Replaces an in-progress attempt with its tombstone. Caller holds the lock."""
+        tombstone = self._finished[key] = _tombstone(self._attempts.pop(key))
+        return tombstone
+
+    def _store(self, key, attempt):
+        attempt["updated_at"] = time.time()
+        if attempt["status"] == "in_progress":
+            self._attempts[key] = attempt
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_attempts:
+                self._time_out(next(iter(self._attempts)))
+        else:
+            self._attempts.pop(key, None)
+            self._finished[key] = attempt
+        if time.monotonic() - self._last_gc >= self.gc_interval:
+            self._gc_locked()
+
+    def get(self, student_id, quiz_id):
+        with self._lock:
+            attempt = self._lookup((student_id, quiz_id))
+            return None if attempt is None else dict(attempt, answers=dict(attempt["answers"]))
+
+    def start(self, student_id, quiz_id, started_at):
+        """Starts an attempt unless one already exists (e.g. from another tab); returns the attempt."""
+        key = (student_id, quiz_id)
+        with self._lock:
+            attempt = self._lookup(key)
+            if attempt is None:
+                attempt = _new_attempt(student_id, quiz_id, started_at)
+                self._store(key, attempt)
+            return dict(attempt, answers=dict(attempt["answers"]))
+
+    def save_answers(self, student_id, quiz_id, answers):
+        """Merges newly chosen answers into an in-progress attempt."""
+        key = (student_id, quiz_id)
+        with self._lock:
+            attempt = self._lookup(key)
+            if attempt is not None and attempt["status"] == "in_progress":
+                attempt["answers"].update(answers)
+                self._store(key, attempt)
+
+    def finish(self, student_id, quiz_id, status, answers=None, score=None, total_questions=None):
+        """Marks an attempt as submitted or timed out, recording the final answers and score."""
+        key = (student_id, quiz_id)
+        with self._lock:
+            attempt = self._lookup(key) or _new_attempt(student_id, quiz_id, time.time())
+            attempt["status"] = status
+            if answers is not None:
+                attempt["answers"] = dict(answers)
+            attempt["score"] = score
+            attempt["total_questions"] = total_questions
+            self._store(key, attempt)
+
+    def _gc_locked(self):
+        now = time.time()
+        expired = [key for key, attempt in self._attempts.items() if self._expired(attempt, now)]
+        for key in expired:
+            self._time_out(key)
+        self._last_gc = time.monotonic()
+        return len(expired)
+
+    def gc(self):
+        """Times out expired in-progress attempts; returns how many were timed out."""
+        with self._lock:
+            return self._gc_locked()
+
+
+class SQLiteAttemptStore:
+    """Attempt store in a local SQLite database, shared by every worker that can reach the file.
+
+    Answers live in their own table, one row per question, so autosaving a page of
+    answers only writes those rows. Rows are never deleted: an in-progress attempt
+    untouched for `ttl_seconds` counts as timed out, so a student can't start the
+    same quiz again with a fresh timer.
+    """
+
+    def __init__(self, path, ttl_seconds=DEFAULT_TTL_SECONDS, gc_interval=DEFAULT_GC_INTERVAL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.gc_interval = gc_interval
+        self._local = threading.local() # sqlite3 connections must not be shared across threads
+        self._gc_lock = threading.Lock()
+        self._last_gc = 0.0
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS attempts (
+                    student_id TEXT NOT NULL,
+                    quiz_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    score INTEGER,
+                    total_questions INTEGER,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (student_id, quiz_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS attempts_status_updated_at ON attempts (status, updated_at);
+                CREATE TABLE IF NOT EXISTS attempt_answers (
+                    student_id TEXT NOT NULL,
+                    quiz_id TEXT NOT NULL,
+                    q_num INTEGER NOT NULL,
+                    answer TEXT NOT NULL,
+                    PRIMARY KEY (student_id, quiz_id, q_num)
+                ) WITHOUT ROWID;
+            """)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _maybe_gc(self):
+        if time.monotonic() - self._last_gc >= self.gc_interval and self._gc_lock.acquire(blocking=False):
+            try:
+                self.gc()
+            finally:
+                self._gc_lock.release()
+
+    def get(self, student_id, quiz_id):
+        conn = self._connection()
+        # An expired in-progress attempt reads as timed out even before gc() marks it.
+        row = conn.execute(
+            "SELECT CASE WHEN status = 'in_progress' AND updated_at < ? THEN 'timed_out' ELSE status END, "
+            "started_at, score, total_questions, updated_at FROM attempts WHERE student_id = ? AND quiz_id = ?",
+            (time.time() - self.ttl_seconds, student_id, quiz_id),
+        ).fetchone()
+        if row is None:
+            return None
+        answers = conn.execute(
+            "SELECT q_num, answer FROM attempt_answers WHERE student_id = ? AND quiz_id = ? ORDER BY q_num",
+            (student_id, quiz_id),
+        ).fetchall()
+        status, started_at, score, total_questions, updated_at = row
+        return {
+            "student_id": student_id,
+            "quiz_id": quiz_id,
+            "status": status,
+            "started_at": started_at,
+            "answers": dict(answers),
+            "score": score,
+            "total_questions": total_questions,
+            "updated_at": updated_at,
+        }
+
+    def start(self, student_id, quiz_id, started_at):
+        """Starts an attempt unless one already exists (e.g. from another tab); returns the attempt."""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO attempts (student_id, quiz_id, status, started_at, updated_at) VALUES (?, ?, 'in_progress', ?, ?) "
+                "ON CONFLICT (student_id, quiz_id) DO NOTHING",
+                (student_id, quiz_id, started_at, time.time()),
+            )
+        self._maybe_gc()
+        return self.get(student_id, quiz_id)
+
+    def save_answers(self, student_id, quiz_id, answers):
+        """Upserts just the given answers of an in-progress attempt."""
+        if not answers:
+            return
+        now = time.time()
+        with self._connection() as conn:
+            updated = conn.execute(
+                "UPDATE attempts SET updated_at = ? WHERE student_id = ? AND quiz_id = ? "
+                "AND status = 'in_progress' AND updated_at >= ?",
+                (now, student_id, quiz_id, now - self.ttl_seconds),
+            ).rowcount
+            if updated:
+                conn.executemany(
+                    "INSERT INTO attempt_answers (student_id, quiz_id, q_num, answer) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (student_id, quiz_id, q_num) DO UPDATE SET answer = excluded.answer",
+                    [(student_id, quiz_id, int(q_num), answer) for q_num, answer in answers.items()],
+                )
+
+    def finish(self, student_id, quiz_id, status, answers=None, score=None, total_questions=None):
+        """Marks an attempt as submitted or timed out, recording the final answers and score."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO attempts (student_id, quiz_id, status, started_at, score, total_questions, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (student_id, quiz_id) DO UPDATE SET "
+                "status = excluded.status, score = excluded.score, total_questions = excluded.total_questions, "
+                "updated_at = excluded.updated_at",
+                (student_id, quiz_id, status, now, score, total_questions, now),
+            )
+            if answers is not None:
+                conn.execute("DELETE FROM attempt_answers WHERE student_id = ? AND quiz_id = ?", (student_id, quiz_id))
+                conn.executemany(
+                    "INSERT INTO attempt_answers (student_id, quiz_id, q_num, answer) VALUES (?, ?, ?, ?)",
+                    [(student_id, quiz_id, int(q_num), answer) for q_num, answer in answers.items()],
+                )
+
+    def gc(self):
+        """Marks expired in-progress attempts as timed out (keeping their answers); returns how many."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._connection() as conn:
+            timed_out = conn.execute(
+                "UPDATE attempts SET status = 'timed_out' WHERE status = 'in_progress' AND updated_at < ?", (cutoff,)
+            ).rowcount
+        self._last_gc = time.monotonic()
+        return timed_out
+
+
+def create_attempt_store():
+    """Builds the attempt store selected by PAO_ATTEMPT_STORE ("sqlite", the default, or "memory")."""
+    kind = os.getenv("PAO_ATTEMPT_STORE", "sqlite").lower()
+    ttl_seconds = float(os.getenv("PAO_ATTEMPT_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    if kind == "memory":
+        return MemoryAttemptStore(ttl_seconds=ttl_seconds)
+    if kind != "sqlite":
+        raise ValueError(f"Unknown PAO_ATTEMPT_STORE '{kind}'; expected 'sqlite' or 'memory'.")
+    return SQLiteAttemptStore(os.getenv("PAO_ATTEMPT_DB", "quiz_attempts.sqlite3"), ttl_seconds=ttl_seconds)
@@ -0,0 +1,119 @@
+"""Local load test for api.py: an exam-start spike of concurrent submissions.
+
+Starts the API in-process against a temporary data directory (unless --url is
+given), opens C keep-alive connections and has R students in total each start
+an attempt and submit it.
+
+    python benchmarks/bench_api_load.py --connections 200 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+import attempt_store  # noqa: E402
+import storage  # noqa: E402
+from fixtures import write_fixture_quiz  # noqa: E402
+
+QUIZ_ID = "quiz_load_test_quiz" # Title-derived id of the fixture quiz
+
+
+async def post(reader, writer, host, path, payload, latencies, statuses):
+    body = json.dumps(payload).encode()
+    request = (
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+    started = time.perf_counter()
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    latencies.append(time.perf_counter() - started)
+    status = int(status_line.split()[1])
+    statuses[status] = statuses.get(status, 0) + 1
+
+
+async def client(host, port, count, num_questions, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(count):
+            student_id = f"student_{id(writer)}_{i}"
+            await post(reader, writer, host, f"/quizzes/{QUIZ_ID}/attempts", {"student_id": student_id},
+                       latencies["start"], statuses)
+            await post(reader, writer, host, f"/quizzes/{QUIZ_ID}/submissions", {
+                "student_id": student_id,
+                "answers": {str(q): "ABCD"[(i + q) % 4] for q in range(num_questions)},
+            }, latencies["submit"], statuses)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    server = None
+    workdir = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        workdir = tempfile.mkdtemp(prefix="pao-api-")
+        quiz_path = os.path.join(workdir, "quiz_data.json")
+        write_fixture_quiz(workdir, args.questions)
+        quiz_api = api.QuizAPI(storage.FileBackend(quiz_path, os.path.join(workdir, "quiz_submissions.json")),
+                               attempt_store.SQLiteAttemptStore(os.path.join(workdir, "quiz_attempts.sqlite3")))
+        await quiz_api.start()
+        server = await asyncio.start_server(quiz_api.handle_connection, "127.0.0.1", 0, backlog=4096)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    latencies, statuses = {"start": [], "submit": []}, {}
+    per_connection = [args.requests // args.connections] * args.connections
+    for i in range(args.requests % args.connections):
+        per_connection[i] += 1
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(host, port, n, args.questions, latencies, statuses) for n in per_connection if n))
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.requests} students (start + submit) over {args.connections} connections in {elapsed:.2f}s "
+          f"-> {2 * args.requests / elapsed:.0f} req/s, statuses {statuses}")
+    for kind, samples in latencies.items():
+        samples.sort()
+        print(f"{kind:>6} latency p50 {samples[len(samples) // 2] * 1000:.1f} ms, "
+              f"p99 {samples[int(len(samples) * 0.99) - 1] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000, help="students, each sending two requests")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--url", help="benchmark an already running API instead of an in-process one; "
+                                      f"it must serve an available quiz with id {QUIZ_ID}")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Exam-start burst: a whole class logs in, starts the same quiz, answers and submits.
+
+Drives N simulated students headlessly through main.py with Streamlit's AppTest:
+
+  login   first page load, role choice, then the Login click (three reruns)
+  start   the Start Quiz click (all students within the same burst)
+  tick    answering: pick an answer and click Save Progress (the autosave rerun)
+  submit  the Submit Answers click (grading + submission write)
+
+and reports p50/p99 rerun latency per phase, CPU and memory per session and
+submit throughput, plus cold/warm catalog load times for the hot paths.
+
+    python benchmarks/bench_exam_start.py --students 50 --ticks 5
+    python benchmarks/bench_exam_start.py --output baseline.json
+    python benchmarks/bench_exam_start.py --baseline baseline.json --tolerance 1.5
+
+With --baseline the run exits non-zero if any p99 latency or the CPU per session
+regressed by more than the tolerance factor, so it can gate local CI-like runs.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import quiz_catalog  # noqa: E402
+import storage  # noqa: E402
+from bench_timer_load import APP_PATH, PASSWORD, click  # noqa: E402
+from fixtures import write_fixture_quiz  # noqa: E402
+
+PHASES = ("login", "start", "tick", "submit")
+
+
+def write_catalog(workdir, num_questions, extra_quizzes):
+    """Writes the quiz students take plus `extra_quizzes` scheduled ones, so catalog loads aren't trivial."""
+    write_fixture_quiz(workdir, num_questions)
+    path = os.path.join(workdir, "quiz_data.json")
+    with open(path) as f:
+        quizzes = json.load(f)
+    template = quizzes[0]
+    for number in range(extra_quizzes):
+        quizzes.append(dict(template, title=f"Scheduled Quiz {number}",
+                            start_date=str(date.today() + timedelta(days=1 + number % 30))))
+    with open(path, "w") as f:
+        json.dump(quizzes, f)
+
+
+def timed(latencies, phase, action):
+    started = time.perf_counter()
+    action()
+    latencies[phase].append(time.perf_counter() - started)
+
+
+def answer_and_save(at, tick):
+    if at.radio:
+        at.radio[tick % len(at.radio)].set_value("B")
+    click(at, "Save Progress")
+
+
+def login(at, student_id):
+    """Same steps as bench_timer_load.start_student, without clicking Start Quiz."""
+    at.run()
+    at.selectbox[0].select("Student").run()
+    for widget in at.text_input:
+        if widget.label == "Student ID":
+            widget.input(student_id)
+        elif widget.label == "Password":
+            widget.input(PASSWORD)
+    click(at, "Login")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_burst(students, ticks):
+    """Drives every student through each phase in turn, like a class starting an exam together.
+
+    AppTest sessions can't be driven from several threads, so the burst is interleaved
+    phase by phase rather than truly concurrent. Returns latencies, CPU and submit wall time.
+    """
+    latencies = {phase: [] for phase in PHASES}
+    sessions = [AppTest.from_file(APP_PATH, default_timeout=120) for _ in range(students)]
+    cpu_started = time.process_time()
+    for number, at in enumerate(sessions):
+        timed(latencies, "login", lambda: login(at, f"student-{number}"))
+    for at in sessions:
+        timed(latencies, "start", lambda: click(at, "Start Quiz"))
+    for tick in range(ticks):
+        for at in sessions:
+            timed(latencies, "tick", lambda: answer_and_save(at, tick))
+    submit_started = time.perf_counter()
+    for at in sessions:
+        timed(latencies, "submit", lambda: click(at, "Submit Answers"))
+    submit_wall = time.perf_counter() - submit_started
+    cpu = time.process_time() - cpu_started
+    for number, at in enumerate(sessions):
+        if at.exception:
+            raise RuntimeError(f"student-{number}: {at.exception[0].value}")
+    return latencies, cpu, submit_wall
+
+
+def memory_per_session(sessions):
+    """Python heap retained per logged-in, in-progress session (traced separately, as tracing slows reruns)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    apps = []
+    for number in range(sessions):
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        login(at, f"memory-{number}")
+        click(at, "Start Quiz")
+        apps.append(at)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / sessions
+
+
+def catalog_load_times(quiz_file_path, submissions_file_path, repeats=20):
+    """Cold (read + build) and warm (cached lookup) catalog load times, in seconds."""
+    backend = storage.create_backend(quiz_file_path, submissions_file_path)
+    cold = []
+    for _ in range(repeats):
+        quiz_catalog.invalidate(backend.name)
+        started = time.perf_counter()
+        quiz_catalog.get_catalog(backend.name, backend.quizzes_version(), backend.load_quizzes)
+        cold.append(time.perf_counter() - started)
+    warm = []
+    for _ in range(repeats * 10):
+        started = time.perf_counter()
+        quiz_catalog.get_catalog(backend.name, backend.quizzes_version(), backend.load_quizzes)
+        warm.append(time.perf_counter() - started)
+    return percentile(cold, 0.5), percentile(warm, 0.5)
+
+
+def check_regressions(results, baseline, tolerance):
+    """Returns a description of every metric that got worse than `baseline * tolerance`."""
+    regressions = []
+    for phase in PHASES:
+        old, new = baseline["latency_ms"][phase]["p99"], results["latency_ms"][phase]["p99"]
+        if old and new > old * tolerance:
+            regressions.append(f"{phase} p99 {new:.1f} ms > {old:.1f} ms x {tolerance}")
+    old, new = baseline["cpu_ms_per_session"], results["cpu_ms_per_session"]
+    if old and new > old * tolerance:
+        regressions.append(f"CPU per session {new:.1f} ms > {old:.1f} ms x {tolerance}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--ticks", type=int, default=5, help="answer/autosave reruns per student")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--quizzes", type=int, default=200, help="extra scheduled quizzes in the catalog")
+    parser.add_argument("--memory-sessions", type=int, default=10)
+    parser.add_argument("--output", help="write the results as JSON (e.g. to use as a baseline)")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pao-exam-start-")
+    cwd = os.getcwd()
+    try:
+        write_catalog(workdir, args.questions, args.quizzes)
+        os.chdir(workdir)  # main.py resolves its data and attempt files relative to the working directory
+        latencies, cpu, submit_wall = run_burst(args.students, args.ticks)
+        memory = memory_per_session(args.memory_sessions)
+        cold_catalog, warm_catalog = catalog_load_times("quiz_data.json", "quiz_submissions.json")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "students": args.students,
+        "ticks": args.ticks,
+        "questions": args.questions,
+        "catalog_quizzes": args.quizzes + 1,
+        "latency_ms": {
+            phase: {"p50": percentile(values, 0.5) * 1000, "p99": percentile(values, 0.99) * 1000}
+            for phase, values in latencies.items()
+        },
+        "cpu_ms_per_session": cpu / args.students * 1000,
+        "memory_kib_per_session": memory / 1024,
+        "submits_per_second": args.students / submit_wall if submit_wall else 0.0,
+        "catalog_load_ms": {"cold": cold_catalog * 1000, "warm": warm_catalog * 1000},
+    }
+
+    print(f"{args.students} students x {args.ticks} ticks, {args.questions} questions, "
+          f"{args.quizzes + 1} quizzes in catalog")
+    for phase in PHASES:
+        stats = results["latency_ms"][phase]
+        print(f"{phase:>7}: p50 {stats['p50']:8.1f} ms   p99 {stats['p99']:8.1f} ms")
+    print(f"    CPU: {results['cpu_ms_per_session']:.1f} ms per session")
+    print(f" memory: {results['memory_kib_per_session']:.1f} KiB per in-progress session")
+    print(f" submit: {results['submits_per_second']:.1f} submits/s")
+    print(f"catalog: {results['catalog_load_ms']['cold']:.2f} ms cold, {results['catalog_load_ms']['warm']:.4f} ms warm")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = check_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmarks loading submissions for analytics: JSON-lines log vs the columnar Arrow export.
+
+Fills a SubmissionLog with N submissions, exports it with submission_export, then
+loads and item-analyzes everything from each format in a fresh process, reporting
+wall time and peak memory growth.
+
+    python benchmarks/bench_export.py --submissions 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import grading  # noqa: E402
+import submission_export  # noqa: E402
+from bench_submission_store import make_record  # noqa: E402
+from fixtures import make_quiz  # noqa: E402
+from submission_store import SubmissionLog  # noqa: E402
+
+QUIZ_ID = "quiz_benchmark_quiz"  # Matches make_record
+
+
+QUIZ = make_quiz(20, title="Benchmark Quiz")  # As many questions as make_record answers
+
+
+def load_from_log(log_dir):
+    return grading.analyze(QUIZ, SubmissionLog(log_dir).read_all())
+
+
+def load_from_export(path):
+    return submission_export.analyze(submission_export.open_export(path), QUIZ, QUIZ_ID)
+
+
+def measure(target, argument, results):
+    """Runs in a child process so each format's peak memory is measured on its own."""
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    analysis = target(argument)
+    elapsed = time.perf_counter() - started
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, (peak_kib - baseline_kib) / 1024, len(analysis['scores'])))
+
+
+def run_isolated(target, argument):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=measure, args=(target, argument, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=1000000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pao-export-")
+    try:
+        log_dir = os.path.join(workdir, "log")
+        log = SubmissionLog(log_dir)
+        batch = 10000
+        for start in range(0, args.submissions, batch):
+            log.append_many([make_record(i) for i in range(start, min(start + batch, args.submissions))])
+        log.close()
+        log_bytes = sum(os.path.getsize(os.path.join(log_dir, name)) for name in os.listdir(log_dir))
+
+        export_path = os.path.join(workdir, "submissions.arrow")
+        started = time.perf_counter()
+        submission_export.export_submissions(SubmissionLog(log_dir).iter_records(), export_path, {QUIZ_ID: QUIZ})
+        export_seconds = time.perf_counter() - started
+
+        print(f"{args.submissions} submissions: log {log_bytes / 2**20:.1f} MiB, "
+              f"export {os.path.getsize(export_path) / 2**20:.1f} MiB (written in {export_seconds:.2f}s)")
+        for label, target, argument in (("json log", load_from_log, log_dir),
+                                        ("arrow", load_from_export, export_path)):
+            elapsed, peak_mib, graded = run_isolated(target, argument)
+            print(f"{label:>9}: load + analyze {graded} submissions in {elapsed:6.2f}s, peak memory +{peak_mib:8.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmarks the vectorized grading engine against the per-record scoring loop.
+
+    python benchmarks/bench_grading.py --submissions 1000000 --questions 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grading  # noqa: E402
+from fixtures import make_quiz  # noqa: E402
+
+
+def make_submissions(num_submissions, num_questions, seed=0):
+    rng = np.random.default_rng(seed)
+    choices = rng.integers(0, 4, size=(num_submissions, num_questions))
+    letters = np.array(list("ABCD"))[choices].tolist()
+    # Answers are keyed by stringified indexes, as they are after a JSON round trip.
+    keys = [str(q) for q in range(num_questions)]
+    return [
+        {"quiz_id": "quiz_benchmark_quiz", "answers": dict(zip(keys, row))}
+        for row in letters
+    ]
+
+
+def loop_scores(quiz, submissions):
+    """The scoring loop previously inlined in main.py's submit handler, applied per record."""
+    scores = []
+    for sub in submissions:
+        score = 0
+        for q_idx, q_info in enumerate(quiz['questions']):
+            if sub['answers'].get(str(q_idx)) == q_info.get('correct_answer'):
+                score += 1
+        scores.append(score)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=1_000_000)
+    parser.add_argument("--questions", type=int, default=20)
+    args = parser.parse_args()
+
+    quiz = make_quiz(args.questions, title="Benchmark Quiz")
+    submissions = make_submissions(args.submissions, args.questions)
+
+    started = time.perf_counter()
+    expected = loop_scores(quiz, submissions)
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = grading.analyze(quiz, submissions)
+    engine_seconds = time.perf_counter() - started
+    assert result["scores"].tolist() == expected
+
+    started = time.perf_counter()
+    grading.regrade(quiz, "quiz_benchmark_quiz", submissions)
+    regrade_seconds = time.perf_counter() - started
+
+    print(f"{args.submissions} submissions x {args.questions} questions")
+    print(f"  per-record loop (scores only):          {loop_seconds:8.2f}s")
+    print(f"  engine (scores + item analysis):        {engine_seconds:8.2f}s")
+    print(f"  engine bulk regrade:                    {regrade_seconds:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
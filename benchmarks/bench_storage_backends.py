@@ -0,0 +1,77 @@
+"""Compares submission throughput of the file and MongoDB storage backends.
+
+N threads (simulating concurrent Streamlit sessions) each submit M records, then
+the whole store is read back. Without --mongo-uri the MongoDB backend runs against
+mongomock, which exercises the batching code path but not a real server.
+
+    python benchmarks/bench_storage_backends.py --threads 16 --submits 500
+    python benchmarks/bench_storage_backends.py --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from bench_submission_store import make_record  # noqa: E402
+
+
+def run(backend, threads, submits):
+    def worker(offset):
+        for i in range(submits):
+            backend.submissions.append(make_record(offset + i))
+
+    workers = [threading.Thread(target=worker, args=(t * submits,)) for t in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    backend.submissions.flush()
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    count = len(backend.submissions.read_all())
+    read_seconds = time.perf_counter() - started
+    assert count == threads * submits, count
+    return threads * submits / write_seconds, read_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--submits", type=int, default=500, help="submits per thread")
+    parser.add_argument("--mongo-uri", help="real MongoDB server to use instead of mongomock")
+    parser.add_argument("--mongo-database", default="pao_school_benchmark")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pao-storage-")
+    try:
+        backends = {"file": storage.FileBackend(os.path.join(workdir, "quiz_data.json"),
+                                                os.path.join(workdir, "quiz_submissions.json"))}
+        if args.mongo_uri:
+            client = storage.get_mongo_client(args.mongo_uri)
+            client.drop_database(args.mongo_database)
+            backends["mongo"] = storage.MongoBackend(uri=args.mongo_uri, database=args.mongo_database)
+        else:
+            import mongomock
+            backends["mongomock"] = storage.MongoBackend(client=mongomock.MongoClient(), database=args.mongo_database)
+
+        print(f"{args.threads} threads x {args.submits} submits")
+        for name, backend in backends.items():
+            rate, read_seconds = run(backend, args.threads, args.submits)
+            print(f"{name:>10}: {rate:10.1f} submits/s, read all in {read_seconds:.3f}s")
+
+        if args.mongo_uri:
+            storage.get_mongo_client(args.mongo_uri).drop_database(args.mongo_database)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmarks student submits/sec against stores that already hold many submissions.
+
+Compares the append-only SubmissionLog with the old load-all/rewrite-all JSON file.
+
+    python benchmarks/bench_submission_store.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from submission_store import SubmissionLog  # noqa: E402
+
+
+def make_record(i, num_questions=20):
+    now = time.time()
+    return {
+        "quiz_title": "Benchmark Quiz",
+        "quiz_id": "quiz_benchmark_quiz",
+        "student_id": f"student_{i}",
+        "answers": {str(q): "ABCD"[(i + q) % 4] for q in range(num_questions)},
+        "score": i % (num_questions + 1),
+        "total_questions": num_questions,
+        "submission_timestamp": now,
+        "submission_time_str": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)),
+    }
+
+
+def bench_log(workdir, existing, submits):
+    log = SubmissionLog(os.path.join(workdir, "log"))
+    batch = 10000
+    for start in range(0, existing, batch):
+        log.append_many([make_record(i) for i in range(start, min(start + batch, existing))])
+    log.flush()
+
+    started = time.perf_counter()
+    for i in range(submits):
+        log.append(make_record(existing + i))
+    log.flush()
+    elapsed = time.perf_counter() - started
+    log.close()
+    return submits / elapsed
+
+
+def bench_legacy(workdir, existing, submits):
+    path = os.path.join(workdir, "quiz_submissions.json")
+    with open(path, "w") as f:
+        json.dump([make_record(i) for i in range(existing)], f, indent=4)
+
+    started = time.perf_counter()
+    for i in range(submits):
+        with open(path, "r") as f:
+            data = json.load(f)
+        data.append(make_record(existing + i))
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+    elapsed = time.perf_counter() - started
+    return submits / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--submits", type=int, default=1000, help="timed submits per size for the log store")
+    parser.add_argument("--legacy-submits", type=int, default=5, help="timed submits per size for the JSON file")
+    parser.add_argument("--legacy-max-size", type=int, default=100_000,
+                        help="skip the legacy store above this many existing records")
+    args = parser.parse_args()
+
+    print(f"{'existing':>10} {'log submits/s':>15} {'legacy submits/s':>18}")
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix="pao-bench-")
+        try:
+            log_rate = bench_log(workdir, size, args.submits)
+            legacy_rate = "skipped"
+            if size <= args.legacy_max_size:
+                legacy_rate = f"{bench_legacy(workdir, size, args.legacy_submits):.1f}"
+            print(f"{size:>10} {log_rate:>15.1f} {legacy_rate:>18}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
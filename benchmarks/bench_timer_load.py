@@ -0,0 +1,121 @@
+"""Load test: CPU per active student while a quiz is in progress.
+
+Drives N simulated students headlessly through login -> Start Quiz -> answering
+-> Submit with Streamlit's AppTest and compares two timer strategies:
+
+  server  the baseline main.py (from git, commit BASELINE_COMMIT), where every
+          active student re-executes the whole script once per second; its
+          one-second sleep is dropped (it costs no CPU) and its self-rerun loop
+          stops after --seconds ticks so the run ends
+  client  the current main.py, whose countdown runs in the browser, so the
+          server does nothing until submit
+
+    python benchmarks/bench_timer_load.py --students 20 --seconds 30
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "main.py")
+sys.path.insert(0, REPO_ROOT)
+PASSWORD = "studywithpao"
+BASELINE_COMMIT = "64ba84c"
+
+# Edits applied to the baseline script so that a run terminates (see the module docstring).
+BASELINE_SLEEP = "python_time.sleep(1) # Sleep for 1 second"
+BASELINE_TICK = """if st.session_state[status_key] == 'in_progress':
+                                st.rerun()"""
+BOUNDED_TICK = """if st.session_state[status_key] == 'in_progress' and st.session_state.setdefault('bench_ticks', 0) < {ticks}:
+                                st.session_state.bench_ticks += 1
+                                st.rerun()"""
+
+from fixtures import write_fixture_quiz  # noqa: E402
+
+
+def click(at, label):
+    for button in at.button:
+        if button.label == label:
+            button.click().run()
+            return
+    raise RuntimeError(f"No button labelled {label!r} on the page")
+
+
+def text_input(at, label):
+    for widget in at.text_input:
+        if widget.label == label:
+            return widget
+    raise RuntimeError(f"No text input labelled {label!r} on the page")
+
+
+def write_baseline_app(workdir, seconds):
+    """Writes the baseline main.py, bounded to `seconds` timer ticks, into `workdir` and returns its path."""
+    source = subprocess.run(["git", "show", f"{BASELINE_COMMIT}:main.py"], cwd=REPO_ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    for old, new in ((BASELINE_SLEEP, "pass"), (BASELINE_TICK, BOUNDED_TICK.format(ticks=seconds))):
+        if source.count(old) != 1:
+            raise RuntimeError(f"Baseline main.py no longer matches the benchmark's edit of {old!r}")
+        source = source.replace(old, new)
+    path = os.path.join(workdir, "baseline_main.py")
+    with open(path, "w") as f:
+        f.write(source)
+    return path
+
+
+def start_student(at, student_id, baseline):
+    at.run()
+    at.selectbox[0].select("Student").run()
+    if not baseline:  # The baseline app has no Student ID input
+        text_input(at, "Student ID").input(student_id)
+    text_input(at, "Password").input(PASSWORD)
+    click(at, "Login")
+    click(at, "Start Quiz")  # In the baseline app this also runs the timer ticks
+
+
+def run_mode(mode, students, seconds, questions):
+    """Returns CPU seconds spent per student for one simulated exam."""
+    workdir = tempfile.mkdtemp(prefix=f"pao-timer-{mode}-")
+    cwd = os.getcwd()
+    try:
+        write_fixture_quiz(workdir, questions)
+        app_path = write_baseline_app(workdir, seconds) if mode == "server" else APP_PATH
+        os.chdir(workdir)  # main.py resolves its data files relative to the working directory
+        # One untimed student first, so module imports and caches don't count against either mode
+        sessions = [AppTest.from_file(app_path, default_timeout=60) for _ in range(students + 1)]
+        for number, at in enumerate(sessions):
+            if number == 1:
+                cpu_started = time.process_time()
+            start_student(at, f"{mode}-{number}", baseline=mode == "server")
+            if number == 0:
+                click(at, "Submit Answers")
+        for at in sessions[1:]:
+            click(at, "Submit Answers")
+        return (time.process_time() - cpu_started) / students
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--seconds", type=int, default=30, help="simulated time each student spends answering")
+    parser.add_argument("--questions", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args.students, args.seconds, args.questions) for mode in ("server", "client")}
+
+    print(f"{args.students} students, {args.seconds}s answering, {args.questions} questions")
+    for mode, cpu in results.items():
+        print(f"{mode:>7}: {cpu * 1000:9.1f} ms CPU per student "
+              f"({cpu / max(args.seconds, 1) * 1000:.2f} ms per student-second)")
+
+
+if __name__ == "__main__":
+    main()
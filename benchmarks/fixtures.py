@@ -0,0 +1,29 @@
+"""Quiz fixtures shared by the benchmarks."""
+import json
+import os
+from datetime import date, timedelta
+
+
+def make_quiz(num_questions, title="Load Test Quiz"):
+    """Returns a quiz (options A-D, answer B) that opened yesterday, so it is available to students."""
+    return {
+        "title": title,
+        "questions": [
+            {
+                "question_text": f"Question {i}?",
+                "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
+                "correct_answer": "B",
+            }
+            for i in range(1, num_questions + 1)
+        ],
+        "duration": 60,
+        "start_date": str(date.today() - timedelta(days=1)),
+        "start_time": "09:00:00",
+        "source_file": "fixture.txt",
+    }
+
+
+def write_fixture_quiz(workdir, num_questions):
+    """Writes `make_quiz(num_questions)` as the only quiz in `workdir`/quiz_data.json."""
+    with open(os.path.join(workdir, "quiz_data.json"), "w") as f:
+        json.dump([make_quiz(num_questions)], f)
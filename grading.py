@@ -0,0 +1,165 @@
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+UNANSWERED = 0 # Matrix code for a question the student left blank
+DISCRIMINATION_GROUP_FRACTION = 0.27 # Classic upper/lower 27% groups for the discrimination index
+
+
+def option_keys_for(quiz):
+    """Returns every option key used in the quiz, in first-seen order (e.g. A, B, C, D)."""
+    keys = {}
+    for question in quiz.get('questions', []):
+        for option_key in question.get('options', {}):
+            keys.setdefault(option_key, None)
+    return list(keys)
+
+
+def answer_key(quiz, option_keys=None):
+    """Returns the correct answers as a uint8 vector of option codes (1-based, 0 = no key)."""
+    option_keys = option_keys if option_keys is not None else option_keys_for(quiz)
+    codes = {key: code for code, key in enumerate(option_keys, start=1)}
+    return np.array([codes.get(q.get('correct_answer'), UNANSWERED) for q in quiz.get('questions', [])], dtype=np.uint8)
+
+
+def _pack_single_letter_answers(answer_dicts, num_questions, option_keys):
+    """Fast path for the common case: every question answered with a one-letter option key.
+
+    All answers are joined into one ASCII buffer and mapped to codes with a lookup
+    table. Returns None when the data doesn't fit that shape.
+    """
+    if num_questions < 2 or not all(len(key) == 1 and key.isascii() for key in option_keys):
+        return None
+    lookup = np.zeros(256, dtype=np.uint8)
+    for code, key in enumerate(option_keys, start=1):
+        lookup[ord(key)] = code
+    for key_type in (str, int):
+        getter = itemgetter(*[key_type(q) for q in range(num_questions)])
+        try:
+            rows = list(map(getter, answer_dicts))
+        except KeyError:
+            continue
+        # Join with NUL separators and check the separators land on every odd byte: a bare
+        # length check would let a blank next to a two-letter answer shift later cells.
+        try:
+            flat = "\0".join(chain.from_iterable(rows)).encode("ascii")
+        except (TypeError, UnicodeEncodeError):
+            return None
+        buffer = np.frombuffer(flat, dtype=np.uint8)
+        if len(buffer) != 2 * len(rows) * num_questions - 1 or buffer[1::2].any() or not buffer[0::2].all():
+            return None # Some answer wasn't a single character
+        return lookup[buffer[0::2]].reshape(len(rows), num_questions)
+    return None
+
+
+def answer_matrix(answer_dicts, num_questions, option_keys):
+    """Packs per-submission answer dicts into a (submissions x questions) uint8 code matrix.
+
+    Answer dicts may be keyed by int (fresh from the form) or by str (read back from JSON).
+    """
+    if not answer_dicts or not num_questions:
+        return np.zeros((len(answer_dicts), num_questions), dtype=np.uint8)
+    packed = _pack_single_letter_answers(answer_dicts, num_questions, option_keys)
+    if packed is not None:
+        return packed
+    # from_records drops rows for empty dicts, so build from a row index that keeps every submission.
+    frame = pd.DataFrame.from_records(answer_dicts, index=range(len(answer_dicts)))
+    frame.columns = [int(column) for column in frame.columns]
+    frame = frame.reindex(columns=range(num_questions))
+    # Map each option key to its position, with -1 for missing answers and values that aren't option keys.
+    codes = pd.Index(option_keys).get_indexer(frame.to_numpy().ravel())
+    return (codes.astype(np.int16) + 1).astype(np.uint8).reshape(frame.shape)
+
+
+def grade(matrix, key):
+    """Returns the score of every row of an answer matrix."""
+    correct = (matrix == key) & (key != UNANSWERED)
+    return correct.sum(axis=1, dtype=np.int32)
+
+
+def score_answers(quiz, answers):
+    """Scores a single student's answers with the same engine used for bulk grading."""
+    option_keys = option_keys_for(quiz)
+    num_questions = len(quiz.get('questions', []))
+    matrix = answer_matrix([answers], num_questions, option_keys)
+    return int(grade(matrix, answer_key(quiz, option_keys))[0])
+
+
+def analyze(quiz, submissions):
+    """Grades every submission of a quiz and computes item statistics in one vectorized pass.
+
+    Returns a dict with:
+      - scores: int array, one per submission
+      - items: DataFrame, one row per question, with difficulty (proportion correct),
+        discrimination (upper minus lower group proportion correct) and the share of
+        students choosing each option (plus unanswered)
+      - distribution: Series mapping each possible score to the number of students
+    """
+    option_keys = option_keys_for(quiz)
+    num_questions = len(quiz.get('questions', []))
+    matrix = answer_matrix([sub.get('answers') or {} for sub in submissions], num_questions, option_keys)
+    return analyze_matrix(quiz, matrix, option_keys)
+
+
+def analyze_matrix(quiz, matrix, option_keys=None):
+    """Same as `analyze`, for submissions already packed into an answer matrix (see `answer_matrix`)."""
+    option_keys = option_keys if option_keys is not None else option_keys_for(quiz)
+    num_questions = len(quiz.get('questions', []))
+    key = answer_key(quiz, option_keys)
+    correct = (matrix == key) & (key != UNANSWERED)
+    scores = correct.sum(axis=1, dtype=np.int32)
+    num_submissions = len(scores)
+
+    # Option frequencies for all questions at once: offset each column's codes so a
+    # single bincount over the flattened matrix yields a (questions x codes) table.
+    num_codes = len(option_keys) + 1
+    offsets = np.arange(num_questions, dtype=np.int64) * num_codes
+    counts = np.bincount((matrix.astype(np.int64) + offsets).ravel(),
+                         minlength=num_questions * num_codes).reshape(num_questions, num_codes)
+
+    if num_submissions:
+        difficulty = correct.mean(axis=0)
+        group_size = max(1, int(round(num_submissions * DISCRIMINATION_GROUP_FRACTION)))
+        ranked = np.argsort(scores, kind='stable')
+        lower, upper = ranked[:group_size], ranked[-group_size:]
+        discrimination = correct[upper].mean(axis=0) - correct[lower].mean(axis=0)
+        shares = counts / num_submissions
+    else:
+        difficulty = discrimination = np.full(num_questions, np.nan)
+        shares = np.zeros_like(counts, dtype=float)
+
+    items = pd.DataFrame({
+        'question': np.arange(1, num_questions + 1),
+        'correct_answer': [q.get('correct_answer') for q in quiz.get('questions', [])],
+        'difficulty': difficulty,
+        'discrimination': discrimination,
+    })
+    for code, option_key in enumerate(option_keys, start=1):
+        items[f'chose_{option_key}'] = shares[:, code]
+    items['unanswered'] = shares[:, UNANSWERED]
+
+    distribution = pd.Series(np.bincount(scores, minlength=num_questions + 1), name='students')
+    distribution.index.name = 'score'
+    return {'scores': scores, 'items': items.set_index('question'), 'distribution': distribution}
+
+
+def regrade(quiz, quiz_id, submissions):
+    """Returns a copy of `submissions` with every record of `quiz_id` re-scored against `quiz`.
+
+    Meant for bulk re-grading after an admin fixes a `correct_answer`; other quizzes'
+    records are passed through untouched.
+    """
+    positions = [i for i, sub in enumerate(submissions) if sub.get('quiz_id') == quiz_id]
+    if not positions:
+        return list(submissions)
+    option_keys = option_keys_for(quiz)
+    num_questions = len(quiz.get('questions', []))
+    matrix = answer_matrix([submissions[i].get('answers') or {} for i in positions], num_questions, option_keys)
+    scores = grade(matrix, answer_key(quiz, option_keys))
+
+    regraded = list(submissions)
+    for position, score in zip(positions, scores.tolist()):
+        regraded[position] = dict(submissions[position], score=score, total_questions=num_questions)
+    return regraded
@@ -1,99 +1,273 @@
 import streamlit as st
-import json
-import os
-from datetime import date, time # Import for type hints if needed, str conversion is used
+import streamlit.components.v1 as components
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time # Import for type hints if needed, str conversion is used
 import time as python_time # For getting current timestamps
+from dotenv import load_dotenv
+import attempt_store
+import grading
+import metrics
+import quiz_catalog
+import quiz_generation
+import quiz_schedule
+import storage
+from submission_index import SubmissionIndex
+
+load_dotenv() # PAO_STORAGE_BACKEND / MONGODB_URI / MONGODB_DATABASE / PAO_ATTEMPT_* / PAO_METRICS* may be set in a .env file
+metrics.configure()
+metrics.begin_rerun() # Times this run; a no-op unless PAO_METRICS is set
 
 # Initialize session state variables if they don't exist
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'user_role' not in st.session_state:
     st.session_state.user_role = None
-# Replace generated_quiz with all_quizzes_data
-if 'all_quizzes_data' not in st.session_state:
-    st.session_state.all_quizzes_data = [] # Initialize as empty list
+if 'student_id' not in st.session_state:
+    st.session_state.student_id = None
 if 'quiz_file_path' not in st.session_state:
     st.session_state.quiz_file_path = "quiz_data.json"
 if 'quiz_submissions_file_path' not in st.session_state: # New session state for submissions
     st.session_state.quiz_submissions_file_path = "quiz_submissions.json"
 
 DEFAULT_PASSWORD = "studywithpao"
+SUBMISSIONS_PAGE_SIZES = (10, 25, 50, 100)
+QUESTIONS_PER_PAGE_OPTIONS = (1, 5, 10, 25) # Student quiz pages; 1 = one question at a time
+PREVIEW_QUESTIONS_PER_PAGE = 10
+GENERATION_CACHE_DIR = ".quiz_generation_cache" # Generated questions, keyed by uploaded file content hash
+GENERATION_WORKERS = 2
 
 # --- Helper Functions ---
-def generate_dummy_mcqs(num_questions):
-    """Generates a list of dummy multiple-choice questions."""
-    quiz_questions = []
-    for i in range(1, num_questions + 1):
-        quiz_questions.append({
-            "question_text": f"This is dummy question {i}. What is the placeholder answer?",
-            "options": {
-                "A": f"Option A for Q{i}",
-                "B": f"Option B for Q{i} (Correct)",
-                "C": f"Option C for Q{i}",
-                "D": f"Option D for Q{i}"
-            },
-            "correct_answer": "B"
-        })
-    return quiz_questions
-
-def save_all_quizzes(quizzes_list, filepath):
-    """Saves the list of quiz objects to a JSON file."""
+@st.cache_resource
+def start_metrics_server():
+    """Serves Prometheus metrics on PAO_METRICS_PORT once per process (None if not configured)."""
+    return metrics.serve()
+
+def rerun():
+    """Records this run's metrics, then reruns the script (use instead of st.rerun())."""
+    metrics.end_rerun()
+    st.rerun()
+
+@st.cache_resource
+def get_generation_executor():
+    """Returns the process pool that generates quiz questions, shared by all sessions."""
+    # "spawn" avoids forking a process that is running Streamlit's server threads
+    return ProcessPoolExecutor(max_workers=GENERATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+@st.cache_resource
+def get_storage_backend(quiz_file_path, submissions_file_path):
+    """Returns the process-wide storage backend (JSON files by default, or MongoDB)."""
+    return storage.create_backend(quiz_file_path, submissions_file_path)
+
+@st.cache_resource
+def get_attempt_store():
+    """Returns the server-side store of quiz attempts (SQLite by default), shared by all sessions."""
+    return attempt_store.create_attempt_store()
+
+def get_storage():
+    """Returns the storage backend for the configured quiz and submission paths."""
+    return get_storage_backend(st.session_state.quiz_file_path, st.session_state.quiz_submissions_file_path)
+
+def save_new_quiz(quiz_data):
+    """Stores one new quiz and returns its generated id, or None if saving failed."""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(quizzes_list, f, indent=4)
-        return True
+        return get_storage().create_quiz(quiz_data)
     except Exception as e:
-        st.error(f"Error saving quizzes to file: {e}")
-        return False
+        st.error(f"Error saving quiz: {e}")
+        return None
+
+def load_all_quizzes():
+    """Loads a list of quiz objects from the storage backend."""
+    try:
+        return get_storage().load_quizzes()
+    except Exception as e:
+        st.error(f"Error loading quizzes: {e}. Starting with an empty quiz list.")
+        return []
+
+def render_countdown(remaining_seconds):
+    """Renders a timer that counts down in the browser, so the server does no work per tick."""
+    countdown_html = f"""
+        <div id="pao-timer" style="font-family: sans-serif; padding: 0.6rem 1rem; border-radius: 0.5rem;
+             background-color: rgba(28, 131, 225, 0.1); color: rgb(0, 66, 128);"></div>
+        <script>
+            // Deadline is computed from the browser's own clock, so client/server clock skew doesn't matter.
+            const deadline = Date.now() + {int(remaining_seconds * 1000)};
+            const el = document.getElementById("pao-timer");
+            function tick() {{
+                const remaining = Math.max(0, Math.ceil((deadline - Date.now()) / 1000));
+                const mins = String(Math.floor(remaining / 60)).padStart(2, "0");
+                const secs = String(remaining % 60).padStart(2, "0");
+                if (remaining > 0) {{
+                    el.textContent = "Time Remaining: " + mins + ":" + secs;
+                    setTimeout(tick, (deadline - Date.now()) % 1000 || 1000); // Wake on the next whole second
+                }} else {{
+                    el.textContent = "Time's up! Answers submitted after the deadline will not be accepted.";
+                    el.style.backgroundColor = "rgba(255, 43, 43, 0.09)";
+                    el.style.color = "rgb(125, 53, 59)";
+                }}
+            }}
+            tick();
+        </script>
+        """
+    # st.iframe replaces components.html in newer Streamlit releases
+    if hasattr(st, "iframe"):
+        st.iframe(countdown_html, height=60)
+    else:
+        components.html(countdown_html, height=60)
+
+def question_markdown(q_num, q_data):
+    """Renders a question and its options as a single markdown block (one delta instead of one per line)."""
+    options_md = "  \n".join(f"&nbsp;&nbsp;&nbsp;&nbsp;{option}. {text}" for option, text in q_data['options'].items())
+    return f"**Q{q_num+1}: {q_data['question_text']}**  \n{options_md}"
+
+def page_bounds(page_number, per_page, total):
+    """Returns the clamped page number and the [start, end) item range for that page."""
+    num_pages = max(1, -(-total // per_page))
+    page_number = min(max(page_number, 0), num_pages - 1)
+    start = page_number * per_page
+    return page_number, num_pages, start, min(start + per_page, total)
+
+def get_quiz_catalog():
+    """Returns the shared, read-only quiz catalog; it is reloaded only when the stored quizzes change."""
+    backend = get_storage()
+    with metrics.phase("catalog_load"):
+        return quiz_catalog.get_catalog(backend.name, backend.quizzes_version(), load_all_quizzes)
+
+# --- Scheduled releases & push notifications ---
+@st.cache_resource
+def get_event_bus():
+    """Returns the process-wide pub/sub bus that pushes quiz and submission events to sessions."""
+    return quiz_schedule.EventBus()
+
+@st.cache_resource
+def get_release_scheduler(quiz_file_path, submissions_file_path):
+    """Returns the process-wide scheduler that opens and closes quizzes at their scheduled times."""
+    backend = get_storage_backend(quiz_file_path, submissions_file_path)
+    # Same cache key as get_quiz_catalog, so both share one catalog instance
+    catalog_source = lambda: quiz_catalog.get_catalog(backend.name, backend.quizzes_version(), backend.load_quizzes)
+    return quiz_schedule.ReleaseScheduler(catalog_source, get_event_bus())
+
+def session_rerun_callback(min_interval=1.0):
+    """Returns `(session_id, callback)` where calling `callback(event)` makes this browser session rerun.
+
+    Streamlit has no public API for rerunning another session, so this reaches into its
+    runtime internals and returns (None, None) where they aren't available (e.g. under
+    AppTest, or if a Streamlit upgrade changes them); the page then updates on the next
+    interaction as before. Pushes closer than `min_interval` seconds apart are coalesced.
+    """
+    try:
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        session_id = get_script_run_ctx().session_id
+        session_manager = Runtime.instance()._session_mgr
+    except Exception:
+        return None, None
+    lock = threading.Lock()
+    state = {"last_push": 0.0, "pending": False}
+
+    def request_rerun():
+        with lock:
+            state["pending"] = False
+            state["last_push"] = python_time.monotonic()
+        session_info = session_manager.get_active_session_info(session_id)
+        if session_info is None:
+            return False
+        # AppSession must be driven from the server's event loop thread
+        session_info.session._event_loop.call_soon_threadsafe(session_info.session.request_rerun, None)
+        return True
 
-def load_all_quizzes(filepath):
-    """Loads a list of quiz objects from a JSON file."""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                else: # Handle case where file might exist but not be a list (e.g. old format)
-                    st.warning("Quiz data file is not in the expected format. Starting with an empty quiz list.")
-                    return []
-        except json.JSONDecodeError:
-            st.error(f"Error decoding JSON from {filepath}. File might be corrupted. Starting with an empty quiz list.")
-            return []
-        except Exception as e:
-            st.error(f"Error loading quizzes from file: {e}. Starting with an empty quiz list.")
-            return []
-    return [] # Return empty list if file doesn't exist
+    def push(event):
+        if session_manager.get_active_session_info(session_id) is None:
+            return False # Browser disconnected; the bus drops this subscription
+        with lock:
+            if state["pending"]:
+                return True
+            delay = state["last_push"] + min_interval - python_time.monotonic()
+            if delay > 0:
+                state["pending"] = True
+                threading.Timer(delay, request_rerun).start()
+                return True
+        return request_rerun()
+    return session_id, push
+
+def subscribe_session(*topics):
+    """Pushes events on `topics` to this session (and stops pushing any other topics)."""
+    if "push_rerun" not in st.session_state:
+        st.session_state.push_rerun = session_rerun_callback()
+    session_id, push = st.session_state.push_rerun
+    if session_id is None:
+        return
+    bus = get_event_bus()
+    for topic in (quiz_schedule.QUIZ_OPENED, quiz_schedule.QUIZ_CLOSED, quiz_schedule.SUBMISSION):
+        if topic in topics:
+            bus.subscribe(topic, session_id, push)
+        else:
+            bus.unsubscribe(topic, session_id)
 
 # --- Helper Functions for Submissions ---
-def save_all_submissions(submissions_list, filepath):
-    """Saves the list of submission objects to a JSON file."""
+@st.cache_resource
+def get_submission_index(quiz_file_path, submissions_file_path):
+    """Returns the process-wide submissions index; call `refresh()` to pick up new submissions."""
+    return SubmissionIndex(get_storage_backend(quiz_file_path, submissions_file_path).submissions)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_item_analysis(quiz_file_path, submissions_file_path, quiz_id, num_submissions, catalog_version, _quiz):
+    """Returns the item analysis of one quiz's submissions, shared by all admin sessions.
+
+    Keyed by submission count and catalog version, so the full pass over the quiz's
+    submissions only reruns when one arrives or the quiz (e.g. its answer key) changes.
+    Answers are streamed from the store, since the submissions index doesn't keep them.
+    """
+    records = get_storage_backend(quiz_file_path, submissions_file_path).submissions.iter_records()
+    with metrics.phase("item_analysis"):
+        return grading.analyze(_quiz, (record for record in records if record.get('quiz_id') == quiz_id))
+
+def update_correct_answer(quiz_id, question_index, new_answer):
+    """Fixes a question's correct answer and re-grades every submission of that quiz in bulk."""
+    catalog = get_quiz_catalog()
+    if quiz_id not in catalog.by_id:
+        st.error("Quiz not found; it may have been removed by another admin.")
+        return False
+    updated_quiz = quiz_catalog.thaw(catalog.by_id[quiz_id])
+    updated_quiz['questions'][question_index]['correct_answer'] = new_answer
+    try:
+        get_storage().update_quiz(quiz_id, updated_quiz)
+    except Exception as e:
+        st.error(f"Error saving quiz: {e}")
+        return False
+    quiz_catalog.invalidate(get_storage().name)
     try:
-        with open(filepath, 'w') as f:
-            json.dump(submissions_list, f, indent=4)
+        get_storage().submissions.rewrite(
+            lambda records: grading.regrade(updated_quiz, quiz_id, records)
+        )
+    except Exception as e:
+        st.error(f"Error re-grading submissions: {e}")
+        return False
+    return True
+
+def append_submission(submission_record):
+    """Appends one submission record without rewriting existing ones."""
+    try:
+        with metrics.phase("submission_write"):
+            get_storage().submissions.append(submission_record)
+        # Admin dashboards rerun and pick it up incrementally instead of polling
+        get_event_bus().publish(quiz_schedule.SUBMISSION, {"quiz_id": submission_record.get("quiz_id")})
         return True
     except Exception as e:
-        st.error(f"Error saving submissions to file: {e}")
+        st.error(f"Error saving submission: {e}")
         return False
 
-def load_all_submissions(filepath):
-    """Loads a list of submission objects from a JSON file."""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                else:
-                    st.warning(f"Submissions file {filepath} is not in the expected list format. Starting fresh.")
-                    return [] 
-        except json.JSONDecodeError:
-            st.error(f"Error decoding JSON from {filepath}. File might be corrupted. Starting with an empty submissions list.")
-            return []
-        except Exception as e:
-            st.error(f"Error loading submissions from file: {e}. Starting with an empty submissions list.")
-            return []
-    return []
+def load_all_submissions():
+    """Loads a list of submission objects from the storage backend."""
+    try:
+        with metrics.phase("submissions_load"):
+            return get_storage().submissions.read_all()
+    except Exception as e:
+        st.error(f"Error loading submissions: {e}. Starting with an empty submissions list.")
+        return []
+
+start_metrics_server() # Does nothing unless PAO_METRICS and PAO_METRICS_PORT are set
 
 # --- UI Logic ---
 
@@ -101,35 +275,35 @@ def load_all_submissions(filepath):
 if not st.session_state.logged_in:
     st.title("Login Portal")
     role_choice = st.selectbox("Select your role", ("Admin", "Student"))
+    # Attempts are stored server-side per student, so a student can resume after reconnecting
+    student_id_input = st.text_input("Student ID") if role_choice == "Student" else ""
     password = st.text_input("Password", type="password")
 
     if st.button("Login"):
         if not password:
             st.warning("Please enter a password.")
+        elif role_choice == "Student" and not student_id_input.strip():
+            st.warning("Please enter your Student ID.")
         elif password == DEFAULT_PASSWORD:
             st.session_state.logged_in = True
             st.session_state.user_role = role_choice
+            st.session_state.student_id = student_id_input.strip() if role_choice == "Student" else None
             if st.session_state.user_role == "Admin":
-                # Load all quizzes when admin logs in
-                raw_quizzes_data = load_all_quizzes(st.session_state.quiz_file_path)
-                # Filter out quizzes that don't have a title, as they are likely malformed
-                # or represent empty entries in the quiz_data.json file.
-                st.session_state.all_quizzes_data = [
-                    quiz for quiz in raw_quizzes_data if quiz.get("title")
-                ]
-                
-                # Notify user if some entries were filtered out
-                if raw_quizzes_data and len(raw_quizzes_data) > len(st.session_state.all_quizzes_data):
+                # Notify user if some entries were filtered out of the catalog (e.g. missing a title)
+                if get_quiz_catalog().skipped_count:
                     st.toast(
                         "Note: Some entries in the quiz data file were incomplete (e.g., missing a title) and have not been displayed.", 
                         icon="⚠️"
                     )
-            st.rerun()
+            rerun()
         else:
             st.error("Invalid password. Please try again.")
 else:
     # Logged-in User View
     st.success(f"Logged in as {st.session_state.user_role}")
+    catalog = get_quiz_catalog()
+    scheduler = get_release_scheduler(st.session_state.quiz_file_path, st.session_state.quiz_submissions_file_path)
+    scheduler.sync(catalog) # No-op unless the catalog changed
 
     if st.session_state.user_role == "Admin":
         st.subheader("Admin Dashboard: Manage Quizzes")
@@ -138,13 +312,15 @@ else:
         with st.form("new_quiz_form"):
             st.write("Create New Quiz")
             quiz_title = st.text_input("Quiz Title*")
-            uploaded_file = st.file_uploader("Upload a file to generate quiz from (optional, content not used yet)")
+            uploaded_file = st.file_uploader("Upload a PDF or text file to generate the quiz from", type=["pdf", "txt", "md"])
             
             num_questions_default = 20
             num_questions = st.number_input("Number of questions to generate", min_value=1, value=num_questions_default)
             quiz_duration = st.number_input("Quiz duration (minutes)", min_value=1, value=10)
             quiz_start_date = st.date_input("Quiz Start Date", value=date.today())
             quiz_start_time = st.time_input("Quiz Start Time", value=time(9,0))
+            quiz_end_date = st.date_input("Quiz End Date (optional)", value=None) # No new attempts after this
+            quiz_end_time = st.time_input("Quiz End Time", value=time(23,59))
             
             submitted_generate = st.form_submit_button("Generate and Save Quiz")
 
@@ -153,32 +329,56 @@ else:
                     st.warning("Quiz Title is required.")
                 elif uploaded_file is None: # For now, let's make file upload mandatory for generation
                     st.warning("Please upload a file to base the quiz on.")
+                elif quiz_end_date is not None and datetime.combine(quiz_end_date, quiz_end_time) <= datetime.combine(quiz_start_date, quiz_start_time):
+                    st.warning("The quiz end must be after its start.")
                 else:
                     st.info(f"Generating quiz titled '{quiz_title}' with {num_questions} questions from '{uploaded_file.name}', duration {quiz_duration} mins, starting {quiz_start_date} at {quiz_start_time}.")
                     
-                    new_quiz_questions = generate_dummy_mcqs(num_questions)
-                    new_quiz_data = {
-                        "title": quiz_title,
-                        "questions": new_quiz_questions,
-                        "duration": quiz_duration,
-                        "start_date": str(quiz_start_date), # Store as string
-                        "start_time": str(quiz_start_time), # Store as string
-                        "source_file": uploaded_file.name
-                    }
-                    
-                    st.session_state.all_quizzes_data.append(new_quiz_data)
-                    if save_all_quizzes(st.session_state.all_quizzes_data, st.session_state.quiz_file_path):
-                        st.success(f"Quiz '{quiz_title}' generated and saved successfully!")
-                        st.rerun() # Rerun to update the display of quizzes
+                    # Questions are shown as soon as each chunk of the document has been processed
+                    progress_placeholder = st.empty()
+                    generated_preview = st.container()
+                    new_quiz_questions = []
+                    try:
+                        with metrics.phase("generate_questions"):
+                            for question in quiz_generation.generate_questions(
+                                uploaded_file, uploaded_file.name, num_questions,
+                                cache_dir=GENERATION_CACHE_DIR, executor=get_generation_executor(),
+                            ):
+                                new_quiz_questions.append(question)
+                                progress_placeholder.caption(f"Generated {len(new_quiz_questions)} of {num_questions} questions...")
+                                generated_preview.markdown(question_markdown(len(new_quiz_questions) - 1, question))
+                    except Exception as e:
+                        st.error(f"Error generating questions from '{uploaded_file.name}': {e}")
+                    if not new_quiz_questions:
+                        st.error(f"No questions could be generated from '{uploaded_file.name}'. Please upload a document with more text.")
                     else:
-                        # Error is handled by save_all_quizzes, but we might want to remove the added quiz if save fails
-                        st.session_state.all_quizzes_data.pop() # Remove the last added quiz if save failed
-                        st.error("Failed to save the new quiz. Please check logs.")
+                        if len(new_quiz_questions) < num_questions:
+                            st.warning(f"Only {len(new_quiz_questions)} questions could be generated from '{uploaded_file.name}'.")
+                        new_quiz_data = {
+                            "title": quiz_title,
+                            "questions": new_quiz_questions,
+                            "duration": quiz_duration,
+                            "start_date": str(quiz_start_date), # Store as string
+                            "start_time": str(quiz_start_time), # Store as string
+                            "source_file": uploaded_file.name
+                        }
+                        if quiz_end_date is not None:
+                            new_quiz_data["end_date"] = str(quiz_end_date)
+                            new_quiz_data["end_time"] = str(quiz_end_time)
+                    
+                        # Only the new quiz is written, so quizzes saved concurrently by other admins are kept
+                        if save_new_quiz(new_quiz_data):
+                            quiz_catalog.invalidate(get_storage().name)
+                            st.success(f"Quiz '{quiz_title}' generated and saved successfully!")
+                            rerun() # Rerun to update the display of quizzes
+                        else:
+                            # Error is handled by save_new_quiz
+                            st.error("Failed to save the new quiz. Please check logs.")
 
         st.markdown("---")
         st.subheader("Available Quizzes")
-        if st.session_state.all_quizzes_data:
-            for index, quiz_item in enumerate(st.session_state.all_quizzes_data):
+        if catalog.quizzes:
+            for index, quiz_item in enumerate(catalog.quizzes):
                 expander_title = f"{quiz_item.get('title', 'Untitled Quiz')} (Questions: {len(quiz_item.get('questions', []))}, Duration: {quiz_item.get('duration', 'N/A')} mins)"
                 with st.expander(expander_title):
                     st.markdown(f"**Start Date:** {quiz_item.get('start_date', 'N/A')}")
@@ -186,76 +386,133 @@ else:
                     if 'source_file' in quiz_item:
                         st.markdown(f"**Source File:** {quiz_item.get('source_file')}")
                     
-                    st.markdown("**Questions:**")
-                    if quiz_item.get('questions'):
-                        for i, q in enumerate(quiz_item['questions']):
-                            st.markdown(f"**Q{i+1}: {q['question_text']}**")
-                            for option, text in q['options'].items():
-                                st.markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;{option}. {text}")
-                            # st.markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;*Correct Answer: {q['correct_answer']}*")
-                            st.markdown("---")
-                    else:
+                    questions = quiz_item.get('questions', [])
+                    if not questions:
                         st.write("No questions found for this quiz.")
+                    # Expander bodies always execute, so questions are only rendered once the
+                    # admin asks for them, and then one page at a time.
+                    elif st.toggle("Show questions", key=f"preview_{index}"):
+                        _, num_preview_pages, _, _ = page_bounds(0, PREVIEW_QUESTIONS_PER_PAGE, len(questions))
+                        preview_page = 0
+                        if num_preview_pages > 1:
+                            preview_page = st.number_input("Page", min_value=1, max_value=num_preview_pages, value=1, key=f"preview_page_{index}") - 1
+                        _, _, start, end = page_bounds(preview_page, PREVIEW_QUESTIONS_PER_PAGE, len(questions))
+                        for i in range(start, end):
+                            st.markdown(question_markdown(i, questions[i]))
+                            # st.markdown(f"&nbsp;&nbsp;&nbsp;&nbsp;*Correct Answer: {questions[i]['correct_answer']}*")
+                            st.markdown("---")
         else:
             st.info("No quizzes have been created yet. Use the form above to generate a new quiz.")
 
+        submission_index = get_submission_index(st.session_state.quiz_file_path, st.session_state.quiz_submissions_file_path)
+        subscribe_session(quiz_schedule.SUBMISSION) # New submissions rerun this dashboard instead of waiting for a refresh
+        with metrics.phase("submissions_refresh"):
+            submission_index.refresh() # Only reads submissions appended since the last rerun
+
+        st.markdown("---")
+        st.subheader("Item Analysis & Regrading")
+        if catalog.quizzes:
+            analysis_quiz_id = st.selectbox(
+                "Quiz to analyze",
+                list(catalog.by_id.keys()),
+                format_func=lambda qid: catalog.by_id[qid].get('title', qid),
+            )
+            analysis_quiz = catalog.by_id[analysis_quiz_id]
+            num_quiz_submissions = submission_index.count(quiz_id=analysis_quiz_id)
+            if not num_quiz_submissions:
+                st.info("No submissions for this quiz yet.")
+            # Analysis reads every submission of the quiz, so it only runs when asked for
+            elif st.toggle("Show item analysis", key=f"item_analysis_{analysis_quiz_id}"):
+                analysis = get_item_analysis(
+                    st.session_state.quiz_file_path, st.session_state.quiz_submissions_file_path,
+                    analysis_quiz_id, num_quiz_submissions, catalog.version, analysis_quiz,
+                )
+                st.markdown(f"**Submissions:** {len(analysis['scores'])} | **Mean score:** {analysis['scores'].mean():.2f}/{len(analysis_quiz.get('questions', []))}")
+                st.markdown("**Score distribution:**")
+                st.bar_chart(analysis['distribution'])
+                st.markdown("**Per-question statistics** (difficulty = share correct, discrimination = top 27% minus bottom 27%):")
+                st.dataframe(analysis['items'])
+
+            if analysis_quiz.get('questions'):
+                with st.form(f"regrade_form_{analysis_quiz_id}"):
+                    st.write("Fix a correct answer and re-grade all submissions for this quiz")
+                    regrade_question = st.selectbox(
+                        "Question",
+                        range(len(analysis_quiz['questions'])),
+                        format_func=lambda q_idx: f"Q{q_idx+1} (current answer: {analysis_quiz['questions'][q_idx].get('correct_answer')})",
+                    )
+                    regrade_answer = st.selectbox("New correct answer", grading.option_keys_for(analysis_quiz))
+                    if st.form_submit_button("Save and Re-grade"):
+                        if update_correct_answer(analysis_quiz_id, regrade_question, regrade_answer):
+                            st.success(f"Q{regrade_question+1} updated and submissions re-graded.")
+                            rerun()
+        else:
+            st.info("No quizzes to analyze yet.")
+
         st.markdown("---")
         st.subheader("Student Submissions & Notifications")
-        all_submissions = load_all_submissions(st.session_state.quiz_submissions_file_path)
 
-        if all_submissions:
-            # Sort by submission time, newest first
-            sorted_submissions = sorted(all_submissions, key=lambda x: x.get('submission_timestamp', 0), reverse=True)
-            for sub in sorted_submissions:
+        filter_cols = st.columns(3)
+        quiz_filter = filter_cols[0].selectbox("Quiz", ["All quizzes"] + submission_index.quiz_ids())
+        student_filter = filter_cols[1].selectbox("Student", ["All students"] + submission_index.student_ids())
+        page_size = filter_cols[2].selectbox("Per page", SUBMISSIONS_PAGE_SIZES)
+        quiz_id_filter = None if quiz_filter == "All quizzes" else quiz_filter
+        student_id_filter = None if student_filter == "All students" else student_filter
+
+        total_submissions = submission_index.count(quiz_id_filter, student_id_filter)
+        if total_submissions:
+            num_pages = (total_submissions + page_size - 1) // page_size
+            page_number = st.number_input("Page", min_value=1, max_value=num_pages, value=1) - 1
+            # Newest first, straight from the timestamp-ordered index
+            for sub in submission_index.page(page_number, page_size, quiz_id=quiz_id_filter, student_id=student_id_filter):
                 st.info(
                     f"Student '{sub.get('student_id', 'Unknown')}' completed quiz: '{sub.get('quiz_title', 'Untitled')}' "
                     f"on {sub.get('submission_time_str', 'N/A')}. "
                     f"Score: {sub.get('score', 'N/A')}/{sub.get('total_questions', 'N/A')}."
                 )
+            first_shown = page_number * page_size + 1
+            last_shown = min(first_shown + page_size - 1, total_submissions)
+            st.caption(f"Showing {first_shown}-{last_shown} of {total_submissions} submissions (page {page_number + 1} of {num_pages}).")
         else:
             st.info("No student submissions yet.")
 
+        # Only shown when reruns are being sampled (PAO_METRICS=1 and PAO_PROFILE_SAMPLE_RATE > 0)
+        if metrics.PROFILE_SAMPLE_RATE:
+            st.markdown("---")
+            with st.expander("Performance Profile (sampled reruns)"):
+                profiled_reruns, profile_rows = metrics.profile_summary()
+                if profile_rows:
+                    st.caption(f"Top functions by cumulative time over {profiled_reruns} profiled reruns (all sessions in this process).")
+                    st.dataframe(profile_rows)
+                else:
+                    st.info("No reruns have been profiled yet.")
+                st.code(metrics.render(), language="text")
+                if st.button("Reset Profile"):
+                    metrics.reset_profile()
+                    rerun()
+
 
     elif st.session_state.user_role == "Student":
         st.subheader("Student Dashboard: Available Quizzes")
 
-        if not st.session_state.all_quizzes_data:
-            raw_quizzes_data = load_all_quizzes(st.session_state.quiz_file_path)
-            st.session_state.all_quizzes_data = [
-                quiz for quiz in raw_quizzes_data if quiz.get("title")
-            ]
-
-        today = date.today()
-        available_quizzes_for_student = []
-        if st.session_state.all_quizzes_data:
-            for quiz_item in st.session_state.all_quizzes_data:
-                quiz_start_date_str = quiz_item.get("start_date")
-                if quiz_start_date_str:
-                    try:
-                        quiz_start_date_obj = date.fromisoformat(quiz_start_date_str)
-                        if quiz_start_date_obj <= today:
-                            available_quizzes_for_student.append(quiz_item)
-                    except ValueError:
-                        pass # Silently skip quizzes with malformed dates
+        # Kept current by the release scheduler (start date and time, optional end), so no per-rerun filtering
+        available_quizzes_for_student = scheduler.released_quizzes()
+        attempt_in_progress = False
 
         if available_quizzes_for_student:
+            attempts = get_attempt_store()
+            student_id = st.session_state.student_id
             for quiz_data in available_quizzes_for_student:
-                # Create a unique identifier for each quiz based on its title (or index if titles aren't unique)
-                # For simplicity, assuming titles are unique enough for keys here.
-                # A more robust solution might use a generated ID for each quiz.
-                quiz_title_safe = quiz_data.get('title', 'untitled').replace(' ', '_').lower()
-                quiz_id = f"quiz_{quiz_title_safe}" # Using a simplified ID
-
-                status_key = f"{quiz_id}_status"
-                start_time_key = f"{quiz_id}_start_timestamp"
-                answers_key = f"{quiz_id}_answers"
-                score_key = f"{quiz_id}_score" # For storing student's score for this quiz attempt
-                total_q_key = f"{quiz_id}_total_questions" # For storing total questions for this quiz attempt
-
+                quiz_id = quiz_catalog.quiz_id_for(quiz_data)
+                page_key = f"{quiz_id}_page" # Current question page (view state only; the attempt itself is server-side)
 
-                # Initialize status if not present
-                st.session_state.setdefault(status_key, 'not_started')
-                quiz_status = st.session_state[status_key]
+                # The attempt lives in the shared attempt store, so it survives reruns, reconnects and restarts
+                with metrics.phase("attempt_load"):
+                    attempt = attempts.get(student_id, quiz_id)
+                quiz_status = attempt['status'] if attempt else 'not_started'
+                if quiz_status == 'not_started' and not scheduler.is_open(quiz_id):
+                    continue # Closed to new attempts; only students who took it still see it
+                attempt_in_progress = attempt_in_progress or quiz_status == 'in_progress'
 
                 expander_title = f"{quiz_data.get('title', 'Untitled Quiz')} (Duration: {quiz_data.get('duration', 'N/A')} mins, Starts: {quiz_data.get('start_date', 'N/A')})"
                 # Keep expander open if quiz is in progress
@@ -268,72 +525,79 @@ else:
 
                     if quiz_status == 'not_started':
                         if st.button("Start Quiz", key=f"start_{quiz_id}"):
-                            st.session_state[status_key] = 'in_progress'
-                            st.session_state[start_time_key] = python_time.time() # Record current time as float
-                            st.rerun()
+                            attempts.start(student_id, quiz_id, python_time.time()) # Record current time as float
+                            rerun()
                     
                     elif quiz_status == 'in_progress':
-                        actual_quiz_start_time = st.session_state.get(start_time_key, python_time.time())
-                        quiz_duration_minutes = quiz_data.get('duration', 0)
-                        quiz_duration_seconds = quiz_duration_minutes * 60
-                        
-                        elapsed_seconds = python_time.time() - actual_quiz_start_time
-                        remaining_seconds = quiz_duration_seconds - elapsed_seconds
+                        remaining_seconds = attempt_store.seconds_left(attempt, quiz_data.get('duration', 0))
 
-                        if remaining_seconds <= 0:
-                            st.session_state[status_key] = 'timed_out'
-                            # Optionally save any answers collected so far if needed
+                        # The deadline is only enforced here on the server, i.e. when the student
+                        # interacts (submits). The countdown itself runs in the browser.
+                        if attempt_store.is_overdue(attempt, quiz_data.get('duration', 0)):
+                            # Autosaved answers are kept with the timed-out attempt
+                            attempts.finish(student_id, quiz_id, 'timed_out')
                             st.error("Time's up! The quiz duration has expired.")
-                            st.rerun()
+                            rerun()
                         else:
-                            mins, secs = divmod(int(remaining_seconds), 60)
                             timer_placeholder = st.empty()
-                            timer_placeholder.info(f"Time Remaining: {mins:02d}:{secs:02d}")
-                            
-                            # To make the timer update, we need to rerun the script periodically.
-                            # This is a simple way; for smoother timers, JavaScript is better.
-                            python_time.sleep(1) # Sleep for 1 second
+                            with timer_placeholder:
+                                render_countdown(max(remaining_seconds, 0))
+
+                            # Only one page of questions is rendered per run; each page's answers are
+                            # autosaved to the attempt store when the student moves on or submits.
+                            questions = quiz_data.get('questions', [])
+                            draft_answers = attempt['answers']
+                            per_page = st.selectbox("Questions per page", QUESTIONS_PER_PAGE_OPTIONS, index=1, key=f"{quiz_id}_per_page")
+                            page_number, num_pages, start, end = page_bounds(st.session_state.get(page_key, 0), per_page, len(questions))
 
                             with st.form(key=f"form_{quiz_id}"):
-                                student_answers = {}
-                                if quiz_data.get('questions'):
-                                    st.markdown("**Questions:**")
-                                    for q_num, q_data in enumerate(quiz_data['questions']):
-                                        st.markdown(f"**Q{q_num+1}: {q_data['question_text']}**")
-                                        options_dict = q_data['options']
-                                        option_keys = list(options_dict.keys())
-                                        selected_option_key = st.radio(
-                                            label="Your answer:",
-                                            options=option_keys,
-                                            format_func=lambda opt_key: f"{opt_key}. {options_dict[opt_key]}",
-                                            key=f"radio_{quiz_id}_q_{q_num}"
-                                        )
-                                        student_answers[q_num] = selected_option_key
-                                
-                                submitted_quiz = st.form_submit_button("Submit Answers")
-                                
+                                page_answers = {}
+                                if questions:
+                                    st.markdown(f"**Questions {start+1}-{end} of {len(questions)}** (answered: {len(draft_answers)})")
+                                    with metrics.phase("render_questions"):
+                                        for q_num in range(start, end):
+                                            q_data = questions[q_num]
+                                            st.markdown(f"**Q{q_num+1}: {q_data['question_text']}**")
+                                            options_dict = q_data['options']
+                                            option_keys = list(options_dict.keys())
+                                            saved_answer = draft_answers.get(q_num)
+                                            selected_option_key = st.radio(
+                                                label="Your answer:",
+                                                options=option_keys,
+                                                index=option_keys.index(saved_answer) if saved_answer in option_keys else None,
+                                                format_func=lambda opt_key, options_dict=options_dict: f"{opt_key}. {options_dict[opt_key]}",
+                                                key=f"radio_{quiz_id}_q_{q_num}"
+                                            )
+                                            if selected_option_key is not None:
+                                                page_answers[q_num] = selected_option_key
+
+                                nav_cols = st.columns(4)
+                                previous_page = nav_cols[0].form_submit_button("Previous", disabled=page_number == 0)
+                                next_page = nav_cols[1].form_submit_button("Next", disabled=page_number >= num_pages - 1)
+                                save_progress = nav_cols[2].form_submit_button("Save Progress")
+                                submitted_quiz = nav_cols[3].form_submit_button("Submit Answers")
+
+                                # Only answers that changed on this page are written
+                                changed_answers = {q_num: ans for q_num, ans in page_answers.items() if draft_answers.get(q_num) != ans}
+                                if (previous_page or next_page or save_progress) and changed_answers:
+                                    attempts.save_answers(student_id, quiz_id, changed_answers)
+                                if previous_page or next_page:
+                                    st.session_state[page_key] = page_number + (1 if next_page else -1)
+                                    rerun()
+                                if save_progress:
+                                    st.toast("Your answers have been saved.")
+
                                 if submitted_quiz:
-                                    st.session_state[answers_key] = student_answers
-                                    st.session_state[status_key] = 'submitted'
+                                    student_answers = dict(sorted({**draft_answers, **page_answers}.items()))
                                     
-                                    # Calculate score
-                                    score = 0
-                                    total_questions = 0
-                                    if quiz_data.get('questions'):
-                                        total_questions = len(quiz_data['questions'])
-                                        for q_idx, q_info in enumerate(quiz_data['questions']):
-                                            submitted_ans_key = student_answers.get(q_idx) # q_idx is 0-based
-                                            correct_ans_key = q_info.get('correct_answer')
-                                            if submitted_ans_key == correct_ans_key:
-                                                score += 1
-                                    
-                                    st.session_state[score_key] = score
-                                    st.session_state[total_q_key] = total_questions
+                                    # Calculate score with the same engine used for bulk grading/analysis
+                                    total_questions = len(quiz_data.get('questions', []))
+                                    score = grading.score_answers(quiz_data, student_answers)
 
                                     submission_record = {
                                         "quiz_title": quiz_data.get('title'),
                                         "quiz_id": quiz_id,
-                                        "student_id": "Student", # Placeholder - needs actual student identification if app expands
+                                        "student_id": student_id,
                                         "answers": student_answers, # Optional: for detailed review later
                                         "score": score,
                                         "total_questions": total_questions,
@@ -341,28 +605,23 @@ else:
                                         "submission_time_str": python_time.strftime("%Y-%m-%d %H:%M:%S", python_time.localtime(python_time.time()))
                                     }
 
-                                    current_submissions = load_all_submissions(st.session_state.quiz_submissions_file_path)
-                                    current_submissions.append(submission_record)
-                                    save_all_submissions(current_submissions, st.session_state.quiz_submissions_file_path)
-                                    
-                                    timer_placeholder.empty() # Clear the timer display
-                                    st.success(f"Quiz '{quiz_data.get('title')}' submitted! Your score: {score}/{total_questions}")
-                                    st.balloons()
-                                    st.rerun()
-                            # Rerun to update timer if not submitted
-                            if st.session_state[status_key] == 'in_progress':
-                                st.rerun() 
+                                    if append_submission(submission_record):
+                                        attempts.finish(student_id, quiz_id, 'submitted', student_answers, score, total_questions)
+                                        timer_placeholder.empty() # Clear the timer display
+                                        st.success(f"Quiz '{quiz_data.get('title')}' submitted! Your score: {score}/{total_questions}")
+                                        st.balloons()
+                                        rerun()
 
                     elif quiz_status == 'submitted':
                         st.success(f"Quiz '{quiz_data.get('title')}' has been submitted.")
                         
-                        display_score = st.session_state.get(score_key, "N/A")
-                        display_total_q = st.session_state.get(total_q_key, "N/A")
-                        if display_score != "N/A":
+                        display_score = attempt.get('score')
+                        display_total_q = attempt.get('total_questions')
+                        if display_score is not None:
                             st.markdown(f"**Your Score: {display_score}/{display_total_q}**")
 
                         st.markdown("**Your Submitted Answers:**")
-                        submitted_ans = st.session_state.get(answers_key, {})
+                        submitted_ans = attempt['answers']
                         if quiz_data.get('questions') and submitted_ans:
                             for q_num, ans_key in submitted_ans.items():
                                 question_text = quiz_data['questions'][q_num]['question_text']
@@ -378,13 +637,20 @@ else:
         else:
             st.info("No quizzes are currently available for you to take. Please check back later.")
 
+        next_release = scheduler.next_release()
+        if next_release:
+            release, next_quiz = next_release
+            st.caption(f"Next quiz: '{next_quiz.get('title', 'Untitled Quiz')}' opens {release:%Y-%m-%d at %H:%M}.")
+        # Opening/closing quizzes rerun this page, but not mid-attempt, where a rerun would only interrupt the student
+        if attempt_in_progress:
+            subscribe_session()
+        else:
+            subscribe_session(quiz_schedule.QUIZ_OPENED, quiz_schedule.QUIZ_CLOSED)
+
     if st.button("Logout"):
-        st.session_state.logged_in = False
-        st.session_state.user_role = None
-        st.session_state.all_quizzes_data = [] # Clear quizzes on logout
-        # Clear student-specific quiz states on logout to avoid issues if another student logs in
-        # This is a simple approach; a more robust one would namespace these by student ID.
-        for key in list(st.session_state.keys()):
-            if key.startswith("quiz_") and ("_status" in key or "_start_timestamp" in key or "_answers" in key or "_score" in key or "_total_questions" in key) :
-                del st.session_state[key]
-        st.rerun()
\ No newline at end of file
+        subscribe_session() # Stop pushing events to this browser
+        # Quiz attempts are kept server-side per student, so the session only holds view state
+        st.session_state.clear()
+        rerun()
+
+metrics.end_rerun()
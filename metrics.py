@@ -0,0 +1,271 @@
+"""Optional hot-path instrumentation: phase timers, file I/O counters and sampled rerun profiles.
+
+Everything is off unless PAO_METRICS=1. While disabled, `phase()` returns a shared
+no-op context manager and the counting functions return right after one flag check.
+
+    PAO_METRICS=1                  collect metrics
+    PAO_METRICS_FILE=metrics.prom  also write them to a file (at most every few seconds)
+    PAO_METRICS_PORT=9108          also serve them at http://<host>:9108/metrics
+    PAO_PROFILE_SAMPLE_RATE=0.05   profile this fraction of reruns with cProfile
+
+Metrics are rendered in the Prometheus text exposition format.
+"""
+import cProfile
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE_INTERVAL = 5.0 # Seconds between metrics file writes
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_NOOP = nullcontext()
+_lock = threading.Lock()
+_phase_buckets = {} # phase -> count per bucket of PHASE_BUCKETS, plus a last +Inf slot
+_phase_sums = {}
+_counters = {} # (name, store) -> value
+_rerun_state = threading.local()
+_profilers = {} # thread -> profiler of the sampled rerun it is running
+_profile_stats = None # pstats.Stats aggregated over every sampled rerun
+_profiled_reruns = 0
+_last_file_write = 0.0
+ENABLED = False
+METRICS_FILE = None
+PROFILE_SAMPLE_RATE = 0.0
+
+
+def configure():
+    """(Re)reads the PAO_METRICS* settings from the environment, e.g. after loading a .env file."""
+    global ENABLED, METRICS_FILE, PROFILE_SAMPLE_RATE
+    ENABLED = os.getenv("PAO_METRICS", "").lower() in ("1", "true", "yes")
+    METRICS_FILE = os.getenv("PAO_METRICS_FILE") if ENABLED else None
+    PROFILE_SAMPLE_RATE = float(os.getenv("PAO_PROFILE_SAMPLE_RATE", 0) or 0) if ENABLED else 0.0
+
+
+configure()
+
+
+# --- Recording ---
+class _PhaseTimer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def phase(name):
+    """Times a named phase: `with metrics.phase("catalog_load"): ...`."""
+    return _PhaseTimer(name) if ENABLED else _NOOP
+
+
+def observe(name, seconds):
+    """Records one duration of phase `name`."""
+    if not ENABLED:
+        return
+    with _lock:
+        buckets = _phase_buckets.get(name)
+        if buckets is None:
+            buckets = _phase_buckets[name] = [0] * (len(PHASE_BUCKETS) + 1)
+            _phase_sums[name] = 0.0
+        for index, bound in enumerate(PHASE_BUCKETS):
+            if seconds <= bound:
+                buckets[index] += 1
+                break
+        else:
+            buckets[-1] += 1
+        _phase_sums[name] += seconds
+
+
+def _add(name, store, value):
+    with _lock:
+        _counters[(name, store)] = _counters.get((name, store), 0) + value
+
+
+def count_read(store, num_bytes):
+    """Counts one file read of `num_bytes` by `store` (e.g. "submissions")."""
+    if ENABLED:
+        _add("pao_file_reads_total", store, 1)
+        _add("pao_file_read_bytes_total", store, num_bytes)
+
+
+def count_write(store, num_bytes):
+    """Counts one file write of `num_bytes` serialized bytes by `store`."""
+    if ENABLED:
+        _add("pao_file_writes_total", store, 1)
+        _add("pao_file_written_bytes_total", store, num_bytes)
+
+
+# --- Per-rerun hooks ---
+def begin_rerun():
+    """Starts timing (and, if sampled, profiling) the current script run."""
+    if not ENABLED:
+        return
+    _finish_interrupted()
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            pass # Another profiler is already active (e.g. a concurrent sampled rerun)
+        else:
+            with _lock:
+                _profilers[threading.current_thread()] = profiler
+    _rerun_state.started = time.perf_counter()
+
+
+def end_rerun():
+    """Finishes the current script run; call before st.rerun() and at the end of the script."""
+    if not ENABLED:
+        return
+    started = getattr(_rerun_state, "started", None)
+    if started is None:
+        return
+    _rerun_state.started = None
+    observe("rerun", time.perf_counter() - started)
+    _stop_profiler(threading.current_thread())
+    if METRICS_FILE:
+        _maybe_write_file()
+
+
+def _finish_interrupted():
+    """Stops the profilers of runs that never reached end_rerun.
+
+    Streamlit ends a run early with RerunException/StopException (e.g. a pushed rerun
+    arriving mid-run), and script errors do the same. Their untimed run is dropped,
+    but a profiler left enabled would keep profiling this thread (and, from Python
+    3.12, block every other profiler), so it is stopped and its samples kept.
+    """
+    _rerun_state.started = None
+    current = threading.current_thread()
+    with _lock:
+        leftovers = [thread for thread in _profilers if thread is current or not thread.is_alive()]
+    for thread in leftovers:
+        _stop_profiler(thread)
+
+
+def _stop_profiler(thread):
+    with _lock:
+        profiler = _profilers.pop(thread, None)
+    if profiler is not None:
+        profiler.disable()
+        _merge_profile(profiler)
+
+
+def _merge_profile(profiler):
+    global _profile_stats, _profiled_reruns
+    with _lock:
+        if _profile_stats is None:
+            _profile_stats = pstats.Stats(profiler)
+        else:
+            _profile_stats.add(profiler)
+        _profiled_reruns += 1
+
+
+def profile_summary(limit=25):
+    """Returns `(profiled_reruns, rows)` for the functions with the most cumulative time.
+
+    Each row is a dict with the function, call count, own time and cumulative time.
+    """
+    with _lock:
+        if _profile_stats is None:
+            return 0, []
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in _profile_stats.stats.items():
+            rows.append({
+                "function": f"{function} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "own_seconds": own,
+                "cumulative_seconds": cumulative,
+            })
+        rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+        return _profiled_reruns, rows[:limit]
+
+
+def reset_profile():
+    global _profile_stats, _profiled_reruns
+    with _lock:
+        _profile_stats = None
+        _profiled_reruns = 0
+
+
+# --- Exposition ---
+def render():
+    """Returns every metric in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        if _phase_buckets:
+            lines.append("# HELP pao_phase_seconds Time spent in each named phase of a rerun.")
+            lines.append("# TYPE pao_phase_seconds histogram")
+            for name in sorted(_phase_buckets):
+                cumulative = 0
+                for bound, count in zip(PHASE_BUCKETS + ("+Inf",), _phase_buckets[name]):
+                    cumulative += count
+                    lines.append(f'pao_phase_seconds_bucket{{phase="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'pao_phase_seconds_sum{{phase="{name}"}} {_phase_sums[name]:.6f}')
+                lines.append(f'pao_phase_seconds_count{{phase="{name}"}} {cumulative}')
+        for metric in sorted({name for name, _ in _counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (name, store), value in sorted(_counters.items()):
+                if name == metric:
+                    lines.append(f'{metric}{{store="{store}"}} {value}')
+        if _profiled_reruns:
+            lines.append("# TYPE pao_profiled_reruns_total counter")
+            lines.append(f"pao_profiled_reruns_total {_profiled_reruns}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path):
+    """Writes the current metrics to `path` atomically (for node_exporter's textfile collector)."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def _maybe_write_file():
+    global _last_file_write
+    now = time.monotonic()
+    if now - _last_file_write < METRICS_FILE_INTERVAL:
+        return
+    _last_file_write = now
+    try:
+        write_file(METRICS_FILE)
+    except OSError:
+        pass # Metrics must never break a rerun
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Scrapes would otherwise be logged to stderr every few seconds
+
+
+def serve(port=None, host="0.0.0.0"):
+    """Serves /metrics on `port` (default PAO_METRICS_PORT) from a daemon thread; returns the server or None."""
+    port = port if port is not None else os.getenv("PAO_METRICS_PORT")
+    if not ENABLED or not port:
+        return None
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="pao-metrics", daemon=True).start()
+    return server
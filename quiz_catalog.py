@@ -0,0 +1,149 @@
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, time
+from types import MappingProxyType
+
+
+def quiz_id_for(quiz):
+    """Returns the quiz id used for session keys and submission records.
+
+    Quizzes carry a generated `quiz_id`; ones saved before ids existed fall back to
+    the old title-derived id, so their existing submissions still match.
+    """
+    if quiz.get('quiz_id'):
+        return quiz['quiz_id']
+    quiz_title_safe = quiz.get('title', 'untitled').replace(' ', '_').lower()
+    return f"quiz_{quiz_title_safe}"
+
+
+def _parse_moment(day, clock, default_clock):
+    """Combines ISO date and time strings; a missing or malformed time falls back to `default_clock`."""
+    parsed_day = date.fromisoformat(day or "")
+    try:
+        parsed_clock = time.fromisoformat(clock) if clock else default_clock
+    except ValueError:
+        parsed_clock = default_clock
+    return datetime.combine(parsed_day, parsed_clock)
+
+
+def _freeze(value):
+    """Recursively converts dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    """Returns a plain, JSON-serializable copy of a frozen catalog entry."""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class QuizCatalog:
+    """Immutable, pre-indexed snapshot of the quiz data file.
+
+    One instance is shared by every session in the process, so memory no longer
+    grows with the number of logged-in users.
+    """
+
+    def __init__(self, raw_quizzes, version=None):
+        self.version = version
+        quizzes = [quiz for quiz in raw_quizzes if isinstance(quiz, dict) and quiz.get("title")]
+        # Entries without a title are likely malformed or empty entries in the file
+        self.skipped_count = len(raw_quizzes) - len(quizzes)
+        self.quizzes = tuple(_freeze(quiz) for quiz in quizzes)
+        self.by_id = MappingProxyType({quiz_id_for(quiz): quiz for quiz in self.quizzes})
+
+        # Release (start_date + start_time) and optional close (end_date + end_time) moments
+        # are parsed once per file version instead of once per rerun.
+        dated = []
+        self._close_by_id = {}
+        for position, quiz in enumerate(self.quizzes):
+            try:
+                release = _parse_moment(quiz.get("start_date"), quiz.get("start_time"), time.min)
+            except ValueError:
+                continue # Quizzes with missing/malformed dates are never offered to students
+            dated.append((release, position))
+            if quiz.get("end_date"):
+                try:
+                    self._close_by_id[quiz_id_for(quiz)] = _parse_moment(quiz.get("end_date"), quiz.get("end_time"), time.max)
+                except ValueError:
+                    pass # A malformed close date leaves the quiz open
+        dated.sort()
+        self._release_times = tuple(release for release, _ in dated)
+        self._by_release = tuple(self.quizzes[position] for _, position in dated)
+        self._release_by_id = {quiz_id_for(self.quizzes[position]): release for release, position in dated}
+
+    def __len__(self):
+        return len(self.quizzes)
+
+    def release_at(self, quiz_id):
+        """Returns when quiz `quiz_id` opens, or None if it is never offered."""
+        return self._release_by_id.get(quiz_id)
+
+    def close_at(self, quiz_id):
+        """Returns when quiz `quiz_id` closes to new attempts, or None if it stays open."""
+        return self._close_by_id.get(quiz_id)
+
+    def schedule(self):
+        """Yields `(release, close, quiz_id)` for every quiz that can be offered, in release order."""
+        for quiz in self._by_release:
+            quiz_id = quiz_id_for(quiz)
+            yield self._release_by_id[quiz_id], self._close_by_id.get(quiz_id), quiz_id
+
+    def released_by(self, moment):
+        """Returns the quizzes released at or before `moment` (including closed ones), oldest first."""
+        return self._by_release[:bisect_right(self._release_times, moment)]
+
+    def next_release_after(self, moment):
+        """Returns `(release, quiz)` for the first quiz released after `moment`, or None."""
+        position = bisect_right(self._release_times, moment)
+        if position == len(self._by_release):
+            return None
+        return self._release_times[position], self._by_release[position]
+
+    def is_available(self, quiz_id, moment):
+        """Returns whether quiz `quiz_id` exists, has been released and hasn't closed at `moment`."""
+        release = self._release_by_id.get(quiz_id)
+        close = self._close_by_id.get(quiz_id)
+        return release is not None and release <= moment and (close is None or moment < close)
+
+    def available_at(self, moment):
+        """Returns the quizzes open at `moment` (released and not closed), oldest first."""
+        released = self.released_by(moment)
+        if not self._close_by_id:
+            return released
+        return tuple(quiz for quiz in released if self.is_available(quiz_id_for(quiz), moment))
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_catalog(key, version, loader):
+    """Returns the process-wide catalog for storage `key`, rebuilding it only when `version` changes.
+
+    `version` is whatever the storage backend reports for its current quiz data (file
+    mtime/size, a MongoDB counter, ...); `loader()` must return the raw list of quiz dicts.
+    """
+    cached = _cache.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.version == version:
+            return cached
+        catalog = QuizCatalog(loader(), version=version)
+        _cache[key] = catalog
+        return catalog
+
+
+def invalidate(key):
+    """Drops the cached catalog so the next `get_catalog` call reloads it."""
+    with _cache_lock:
+        _cache.pop(key, None)
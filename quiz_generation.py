@@ -0,0 +1,210 @@
+import codecs
+import hashlib
+import json
+import os
+import random
+import re
+from collections import deque
+
+GENERATOR_VERSION = 2 # Bump when question generation changes, so cached results are not reused
+HASH_BLOCK_BYTES = 1024 * 1024
+CHUNK_CHARS = 8000
+OPTION_KEYS = ("A", "B", "C", "D")
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]{3,}")
+_STOPWORDS = frozenset("""
+    about above after again against also among another because been before being below between both
+    cannot could does doing down during each either else every from further have having here into
+    itself just many more most much must neither often only other over same shall should some such
+    than that their them then there these they this those though through under until upon very
+    were what when where whether which while will with within without would your
+""".split())
+
+
+# --- Reading uploads ---
+def content_hash(fileobj):
+    """Returns the SHA-256 of a binary file object, read block by block, and rewinds it."""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(HASH_BLOCK_BYTES), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _is_pdf(fileobj, filename):
+    if filename and filename.lower().endswith(".pdf"):
+        return True
+    position = fileobj.tell()
+    magic = fileobj.read(5)
+    fileobj.seek(position)
+    return magic == b"%PDF-"
+
+
+def _iter_pdf_text(fileobj):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("Generating quizzes from PDF files requires the 'pypdf' package.")
+    reader = PdfReader(fileobj)
+    for page in reader.pages: # Pages are parsed lazily, one at a time
+        yield page.extract_text() or ""
+
+
+def _iter_plain_text(fileobj):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for block in iter(lambda: fileobj.read(HASH_BLOCK_BYTES), b""):
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def iter_text_chunks(fileobj, filename=None, chunk_chars=CHUNK_CHARS):
+    """Yields the document's text in chunks of roughly `chunk_chars`, split at sentence ends.
+
+    PDFs are read page by page and text files block by block, so the whole
+    document is never decoded at once.
+    """
+    fileobj.seek(0)
+    pieces = _iter_pdf_text(fileobj) if _is_pdf(fileobj, filename) else _iter_plain_text(fileobj)
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= chunk_chars:
+            # Cut after the last sentence end in the window; hard cut if there is none.
+            window = buffer[:chunk_chars]
+            cut = max(window.rfind(". "), window.rfind("? "), window.rfind("! "), window.rfind("\n\n"))
+            cut = cut + 1 if cut > 0 else chunk_chars
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    if buffer.strip():
+        yield buffer
+
+
+# --- Deterministic local generator ---
+def _stable_int(text):
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _keyword(sentence):
+    """Picks the longest non-stopword in a sentence (first one wins ties)."""
+    best = None
+    for word in _WORD_RE.findall(sentence):
+        if word.lower() not in _STOPWORDS and (best is None or len(word) > len(best)):
+            best = word
+    return best
+
+
+def local_questions(text, max_questions):
+    """Builds fill-in-the-blank multiple-choice questions from a chunk of text.
+
+    Fully offline and deterministic: the same text always yields the same
+    questions, options and correct answers. Distractors are keywords of other
+    sentences in the same chunk.
+    """
+    sentences = [s.strip() for s in _SENTENCE_END_RE.split(" ".join(text.split()))]
+    candidates = []
+    seen_keywords = {}
+    for sentence in sentences:
+        if not 40 <= len(sentence) <= 300:
+            continue
+        keyword = _keyword(sentence)
+        if keyword:
+            candidates.append((sentence, keyword))
+            seen_keywords.setdefault(keyword.lower(), keyword)
+    pool = list(seen_keywords.values())
+
+    questions = []
+    for sentence, keyword in candidates:
+        if len(questions) >= max_questions:
+            break
+        others = [word for word in pool if word.lower() != keyword.lower()]
+        if len(others) < len(OPTION_KEYS) - 1:
+            break # Not enough distinct keywords in this chunk to make distractors
+        seed = _stable_int(sentence)
+        distractors = random.Random(seed).sample(others, len(OPTION_KEYS) - 1)
+        correct_position = seed % len(OPTION_KEYS)
+        choices = distractors[:correct_position] + [keyword] + distractors[correct_position:]
+        blanked = re.sub(rf"\b{re.escape(keyword)}\b", "_____", sentence, count=1)
+        questions.append({
+            "question_text": f"Fill in the blank: {blanked}",
+            "options": dict(zip(OPTION_KEYS, choices)),
+            "correct_answer": OPTION_KEYS[correct_position],
+        })
+    return questions
+
+
+# --- Pipeline ---
+def _cache_path(cache_dir, digest, num_questions):
+    return os.path.join(cache_dir, f"{digest}-{num_questions}-v{GENERATOR_VERSION}.json")
+
+
+def _load_cached(cache_dir, digest, num_questions):
+    try:
+        with open(_cache_path(cache_dir, digest, num_questions), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(cache_dir, digest, num_questions, questions):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, digest, num_questions)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(questions, f)
+    os.replace(tmp_path, path)
+
+
+def generate_questions(fileobj, filename, num_questions, cache_dir=None, executor=None,
+                       generator=local_questions):
+    """Yields up to `num_questions` questions generated from an uploaded document, as they are produced.
+
+    Chunks are handed to `executor` (e.g. a ProcessPoolExecutor) with only a few in
+    flight at once, so large documents are streamed rather than loaded whole; without
+    an executor, chunks are processed inline. Results are cached by content hash in
+    `cache_dir`, so re-uploading the same file doesn't redo the work.
+    """
+    digest = content_hash(fileobj)
+    if cache_dir:
+        cached = _load_cached(cache_dir, digest, num_questions)
+        if cached is not None:
+            yield from cached
+            return
+
+    produced = []
+    seen_texts = set()
+
+    def accept(questions):
+        for question in questions:
+            if len(produced) >= num_questions:
+                return
+            if question["question_text"] not in seen_texts:
+                seen_texts.add(question["question_text"])
+                produced.append(question)
+                yield question
+
+    chunks = iter_text_chunks(fileobj, filename)
+    if executor is None:
+        for chunk in chunks:
+            yield from accept(generator(chunk, num_questions - len(produced)))
+            if len(produced) >= num_questions:
+                break
+    else:
+        max_in_flight = max(2, getattr(executor, "_max_workers", 2) * 2)
+        in_flight = deque()
+        try:
+            for chunk in chunks:
+                in_flight.append(executor.submit(generator, chunk, num_questions))
+                if len(in_flight) >= max_in_flight:
+                    yield from accept(in_flight.popleft().result())
+                    if len(produced) >= num_questions:
+                        break
+            while in_flight and len(produced) < num_questions:
+                yield from accept(in_flight.popleft().result())
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    if cache_dir and produced:
+        _store_cached(cache_dir, digest, num_questions, produced)
@@ -0,0 +1,162 @@
+import heapq
+import threading
+from datetime import datetime
+
+from quiz_catalog import quiz_id_for
+
+QUIZ_OPENED = "quiz_opened"
+QUIZ_CLOSED = "quiz_closed"
+SUBMISSION = "submission"
+DEFAULT_REFRESH_INTERVAL = 30.0 # Seconds between checks for quizzes created by other processes
+
+
+class EventBus:
+    """Minimal in-process pub/sub.
+
+    Subscribers are keyed (e.g. by browser session), so re-subscribing on every rerun
+    replaces the previous callback instead of piling up. A callback that returns False
+    or raises is dropped, which is how disconnected sessions fall away.
+    """
+
+    def __init__(self):
+        self._subscribers = {} # topic -> {key: callback}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, key, callback):
+        with self._lock:
+            self._subscribers.setdefault(topic, {})[key] = callback
+
+    def unsubscribe(self, topic, key):
+        with self._lock:
+            self._subscribers.get(topic, {}).pop(key, None)
+
+    def publish(self, topic, event):
+        """Calls every subscriber of `topic` with `event`; returns how many were notified."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, {}).items())
+        notified = 0
+        for key, callback in subscribers:
+            try:
+                keep = callback(event) is not False
+            except Exception:
+                keep = False
+            if keep:
+                notified += 1
+            else:
+                with self._lock:
+                    if self._subscribers.get(topic, {}).get(key) is callback:
+                        del self._subscribers[topic][key]
+        return notified
+
+
+class ReleaseScheduler:
+    """Keeps the set of open quizzes current from a time-ordered heap of release and close times.
+
+    Sessions read `open_quizzes()` / `released_quizzes()`, which are precomputed, instead
+    of filtering the catalog on every rerun. A background thread sleeps until the next
+    release or close and then publishes QUIZ_OPENED / QUIZ_CLOSED on the bus. Quizzes
+    added or edited are picked up through `sync(catalog)` and, for changes made by other
+    processes, by re-reading `catalog_source()` every `refresh_interval` seconds.
+    """
+
+    def __init__(self, catalog_source, bus, refresh_interval=DEFAULT_REFRESH_INTERVAL, clock=datetime.now):
+        self.catalog_source = catalog_source
+        self.bus = bus
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._catalog = None
+        self._heap = [] # (moment, quiz_id) of every release/close still to come
+        self._released = ()
+        self._open = ()
+        self._open_ids = frozenset()
+        self._thread = threading.Thread(target=self._run, name="quiz-release-scheduler", daemon=True)
+        self._thread.start()
+
+    # --- Reading ---
+    def open_quizzes(self):
+        """Returns the quizzes students can start now, oldest release first."""
+        self._advance_if_due()
+        return self._open
+
+    def released_quizzes(self):
+        """Returns every released quiz, including closed ones (for showing past attempts)."""
+        self._advance_if_due()
+        return self._released
+
+    def is_open(self, quiz_id):
+        self._advance_if_due()
+        return quiz_id in self._open_ids
+
+    def next_release(self):
+        """Returns `(moment, quiz)` for the next quiz to open, or None."""
+        catalog = self._catalog
+        return catalog.next_release_after(self.clock()) if catalog is not None else None
+
+    # --- Updating ---
+    def sync(self, catalog):
+        """Switches to a newer catalog; cheap when `catalog` is the one already scheduled."""
+        if catalog is self._catalog:
+            return
+        with self._cond:
+            if catalog is self._catalog:
+                return
+            first_sync = self._catalog is None
+            self._catalog = catalog
+            now = self.clock()
+            self._heap = [(release, quiz_id) for release, _, quiz_id in catalog.schedule() if release > now]
+            self._heap.extend((close, quiz_id) for _, close, quiz_id in catalog.schedule()
+                              if close is not None and close > now)
+            heapq.heapify(self._heap)
+            changes = self._recompute(now)
+            self._cond.notify_all() # The next wake-up may now be sooner
+        if not first_sync: # e.g. a quiz was just created with a start time in the past
+            self._publish(changes)
+
+    def _advance_if_due(self):
+        """Applies releases/closes that are due, in case the scheduler thread hasn't woken yet."""
+        heap = self._heap
+        if heap and heap[0][0] <= self.clock():
+            with self._cond:
+                changes = self._pop_due()
+            self._publish(changes)
+
+    def _pop_due(self):
+        """Pops due heap entries and recomputes the open set. Caller holds the lock."""
+        now = self.clock()
+        if not self._heap or self._heap[0][0] > now:
+            return None
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+        return self._recompute(now)
+
+    def _recompute(self, now):
+        """Rebuilds the released/open tuples; returns the (opened, closed) quiz ids. Caller holds the lock."""
+        previous = self._open_ids
+        self._released = self._catalog.released_by(now)
+        self._open = self._catalog.available_at(now)
+        self._open_ids = frozenset(quiz_id_for(quiz) for quiz in self._open)
+        return self._open_ids - previous, previous - self._open_ids
+
+    def _publish(self, changes):
+        if not changes:
+            return
+        opened, closed = changes
+        for quiz_id in opened:
+            self.bus.publish(QUIZ_OPENED, {"quiz_id": quiz_id})
+        for quiz_id in closed:
+            self.bus.publish(QUIZ_CLOSED, {"quiz_id": quiz_id})
+
+    def _run(self):
+        while True:
+            with self._cond:
+                timeout = self.refresh_interval
+                if self._heap:
+                    timeout = min(timeout, max(0.0, (self._heap[0][0] - self.clock()).total_seconds()))
+                self._cond.wait(timeout)
+                changes = self._pop_due() if self._catalog is not None else None
+            self._publish(changes)
+            try:
+                self.sync(self.catalog_source())
+            except Exception:
+                pass # Storage briefly unavailable; try again on the next wake-up
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+import metrics
+from quiz_catalog import quiz_id_for
+
+QUIZ_SUFFIX = ".json"
+_SAFE_FILE_NAME_RE = re.compile(r"[A-Za-z0-9_-]{1,100}")
+
+
+def new_quiz_id():
+    """Generates a stable, unique quiz id (no longer derived from the title)."""
+    return f"quiz_{uuid.uuid4().hex[:12]}"
+
+
+def _file_name(quiz_id):
+    """Returns the file name a quiz is stored under.
+
+    Generated ids are used as they are. Legacy title-derived ids may contain any
+    character (e.g. "quiz_bio/chem_quiz"), so those are stored under a hash of the id
+    instead; the id itself is kept inside the JSON. "~" can't occur in a plain name,
+    so the two never collide.
+    """
+    if _SAFE_FILE_NAME_RE.fullmatch(quiz_id):
+        return quiz_id + QUIZ_SUFFIX
+    return "quiz~" + hashlib.sha1(quiz_id.encode("utf-8")).hexdigest() + QUIZ_SUFFIX
+
+
+def _write_atomically(path, data):
+    """Writes JSON to a temporary file and renames it over `path`, so readers never see a partial quiz."""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    payload = json.dumps(data, indent=4).encode("utf-8")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    metrics.count_write("quizzes", len(payload))
+
+
+class QuizStore:
+    """Quiz catalog stored as one JSON file per quiz in a directory.
+
+    Creating or updating a quiz writes only that quiz's file through an atomic
+    rename, so the cost doesn't depend on catalog size and concurrent admins
+    can't overwrite each other's quizzes.
+    """
+
+    def __init__(self, directory, legacy_path=None):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            self._create(legacy_path)
+
+    def _create(self, legacy_path):
+        """Creates the store, importing quizzes from the old single-file list format if present."""
+        legacy_quizzes = []
+        if legacy_path and os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "r") as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    legacy_quizzes = [quiz for quiz in data if isinstance(quiz, dict) and quiz.get("title")]
+            except (OSError, ValueError):
+                legacy_quizzes = [] # Unreadable legacy file: start with an empty catalog
+
+        tmp_dir = f"{self.directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            used_ids = set()
+            for position, quiz in enumerate(legacy_quizzes):
+                # Keep the title-derived ids of existing quizzes so their submissions still match.
+                quiz_id = base_id = quiz_id_for(quiz)
+                suffix = 2
+                while quiz_id in used_ids:
+                    quiz_id = f"{base_id}_{suffix}"
+                    suffix += 1
+                used_ids.add(quiz_id)
+                _write_atomically(os.path.join(tmp_dir, _file_name(quiz_id)),
+                                  dict(quiz, quiz_id=quiz_id, created_at=position))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True) # Retry the migration from scratch next time
+            raise
+        try:
+            os.rename(tmp_dir, self.directory)
+        except OSError:
+            # Another process created the store first; discard our copy.
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+
+    def _path(self, quiz_id):
+        return os.path.join(self.directory, _file_name(quiz_id))
+
+    def version(self):
+        """Changes whenever a quiz file is created, replaced or removed."""
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load_all(self):
+        """Returns every stored quiz, oldest first."""
+        quizzes = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(QUIZ_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    payload = f.read()
+                metrics.count_read("quizzes", len(payload))
+                quiz = json.loads(payload)
+            except (OSError, ValueError):
+                continue # Skip a quiz that was removed or is unreadable rather than the whole catalog
+            if isinstance(quiz, dict):
+                quizzes.append(quiz)
+        quizzes.sort(key=lambda quiz: (quiz.get("created_at", 0), quiz.get("quiz_id", "")))
+        return quizzes
+
+    def create(self, quiz):
+        """Stores a new quiz under a freshly generated id and returns the id."""
+        quiz_id = new_quiz_id()
+        _write_atomically(self._path(quiz_id), dict(quiz, quiz_id=quiz_id, created_at=time.time()))
+        return quiz_id
+
+    def update(self, quiz_id, quiz):
+        """Replaces one existing quiz."""
+        path = self._path(quiz_id)
+        if not os.path.exists(path):
+            raise KeyError(quiz_id)
+        _write_atomically(path, dict(quiz, quiz_id=quiz_id))
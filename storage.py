@@ -0,0 +1,284 @@
+import os
+import threading
+import time
+
+from quiz_store import QuizStore, new_quiz_id
+from submission_store import SubmissionLog
+
+DEFAULT_MONGODB_URI = "mongodb://localhost:27017"
+DEFAULT_MONGODB_DATABASE = "pao_school"
+SEQUENCE_GAP_TIMEOUT = 60.0 # Seconds a reserved submission number may stay unwritten before readers skip it
+
+
+class FileBackend:
+    """Default backend: one JSON file per quiz, submissions in an append-only SubmissionLog.
+
+    Both are migrated on first use from the old single-file formats at the given paths.
+    """
+
+    def __init__(self, quiz_file_path, submissions_file_path):
+        store_dir = os.path.splitext(quiz_file_path)[0] + "_store"
+        self.name = f"file:{os.path.abspath(store_dir)}"
+        self.quizzes = QuizStore(store_dir, legacy_path=quiz_file_path)
+        log_dir = os.path.splitext(submissions_file_path)[0] + "_log"
+        self.submissions = SubmissionLog(log_dir, legacy_path=submissions_file_path)
+
+    def quizzes_version(self):
+        """Changes whenever a quiz is created or updated (used to invalidate the shared catalog)."""
+        return self.quizzes.version()
+
+    def load_quizzes(self):
+        return self.quizzes.load_all()
+
+    def create_quiz(self, quiz):
+        """Stores a new quiz and returns its generated id."""
+        return self.quizzes.create(quiz)
+
+    def update_quiz(self, quiz_id, quiz):
+        self.quizzes.update(quiz_id, quiz)
+
+
+# --- MongoDB ---
+_mongo_clients = {}
+_mongo_clients_lock = threading.Lock()
+
+
+def get_mongo_client(uri, max_pool_size=100):
+    """Returns the single pooled MongoClient for `uri` in this process."""
+    with _mongo_clients_lock:
+        client = _mongo_clients.get(uri)
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(uri, maxPoolSize=max_pool_size)
+            _mongo_clients[uri] = client
+        return client
+
+
+def _document(record):
+    """Copies a submission record into a BSON-encodable document.
+
+    Answers are keyed by question index, which the app and API hold as ints; BSON
+    only allows string keys, so they are stored as strings, as in the JSON log.
+    """
+    document = dict(record)
+    answers = document.get('answers')
+    if isinstance(answers, dict):
+        document['answers'] = {str(q_num): answer for q_num, answer in answers.items()}
+    return document
+
+
+def _without_seq(doc):
+    doc.pop('seq', None)
+    return doc
+
+
+def _numbered(document, seq):
+    if seq is not None:
+        document['seq'] = seq
+    return document
+
+
+class MongoSubmissionStore:
+    """Submission store on a MongoDB collection, with the same interface as SubmissionLog.
+
+    Appends from concurrent sessions are group-committed: a background writer drains
+    everything queued so far with one `insert_many`, and each caller returns once the
+    batch holding its records has been written.
+
+    Each submission is stamped with a `seq` number reserved from a server-side counter,
+    which incremental readers tail on. ObjectIds can't be used for that: ids made by
+    different processes in the same second don't sort in insertion order.
+    """
+
+    def __init__(self, database, batch_delay=0.005):
+        self.collection = database['submissions']
+        self.meta = database['meta']
+        self.batch_delay = batch_delay
+        self.collection.create_index('quiz_id')
+        self.collection.create_index('student_id')
+        self.collection.create_index('submission_timestamp')
+        self.collection.create_index('seq')
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._next_batch = 1 # Batch that newly queued records will be written in
+        self._done_batch = 0
+        self._errors = {}
+        self._writer = threading.Thread(target=self._write_batches, name="mongo-submission-writer", daemon=True)
+        self._writer.start()
+
+    def _write_batches(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+            time.sleep(self.batch_delay) # Let concurrent submits join this batch
+            with self._cond:
+                batch, self._pending = self._pending, []
+                batch_no = self._next_batch
+                self._next_batch += 1
+            error = None
+            try:
+                for seq, document in zip(self._reserve(len(batch)), batch):
+                    document['seq'] = seq
+                self.collection.insert_many(batch, ordered=False)
+            except Exception as e:
+                error = e
+            with self._cond:
+                if error is not None:
+                    self._errors[batch_no] = error
+                self._errors.pop(batch_no - 1000, None) # Nobody waits on batches this old
+                self._done_batch = batch_no
+                self._cond.notify_all()
+
+    def append(self, record, sync=False):
+        self.append_many([record], sync=sync)
+
+    def append_many(self, records, sync=False):
+        """Queues records for the next batch and waits until that batch is written."""
+        if not records:
+            return
+        with self._cond:
+            # Copies, because insert_many adds an `_id` to the documents it is given.
+            self._pending.extend(_document(record) for record in records)
+            batch_no = self._next_batch
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._done_batch >= batch_no)
+            error = self._errors.get(batch_no)
+        if error is not None:
+            raise error
+
+    def flush(self):
+        with self._cond:
+            if self._pending:
+                batch_no = self._next_batch
+                self._cond.wait_for(lambda: self._done_batch >= batch_no)
+
+    def close(self):
+        self.flush()
+
+    def _reserve(self, count):
+        """Reserves `count` consecutive submission numbers from the server-side counter."""
+        from pymongo import ReturnDocument
+        doc = self.meta.find_one_and_update({'_id': 'submissions'}, {'$inc': {'seq': count}},
+                                            upsert=True, return_document=ReturnDocument.AFTER)
+        return range(doc['seq'] - count + 1, doc['seq'] + 1)
+
+    def _generation(self):
+        doc = self.meta.find_one({'_id': 'submissions'})
+        return doc.get('generation', 0) if doc else 0
+
+    def _ordered(self, query):
+        # Submissions stored before numbering existed have no `seq` and sort first.
+        return self.collection.find(query, {'_id': 0}).sort([('seq', 1), ('_id', 1)])
+
+    def read_all(self):
+        return [_without_seq(doc) for doc in self._ordered({})]
+
+    def iter_records(self):
+        """Streams every submission in insertion order through a server-side cursor."""
+        return (_without_seq(doc) for doc in self._ordered({}))
+
+    def read_since(self, cursor=None):
+        """Same contract as SubmissionLog.read_since.
+
+        The cursor is (generation, done, seen, gap_since): every submission numbered up
+        to `done` has been returned, plus the numbers in `seen` above it. Numbers are
+        reserved before their batch is inserted, so a later batch can become visible
+        first; the gap below it is re-read until filled, or skipped once it has been
+        open for SEQUENCE_GAP_TIMEOUT seconds (its insert failed).
+        """
+        generation = self._generation()
+        reset = cursor is None or cursor[0] != generation
+        if reset:
+            done, seen, gap_since = 0, frozenset(), None
+        else:
+            _, done, seen, gap_since = cursor
+        records = []
+        pending = set(seen)
+        for doc in self._ordered({} if reset else {'seq': {'$gt': done}}):
+            seq = doc.pop('seq', None)
+            if seq in seen:
+                continue # Returned by an earlier call, while a gap below it was still open
+            records.append(doc)
+            if seq is not None:
+                pending.add(seq)
+
+        while done + 1 in pending:
+            done += 1
+            pending.discard(done)
+        if not pending:
+            gap_since = None
+        elif gap_since is None:
+            gap_since = time.monotonic()
+        elif time.monotonic() - gap_since > SEQUENCE_GAP_TIMEOUT:
+            done = min(pending) # Give up on the oldest gap
+            while done in pending:
+                pending.discard(done)
+                done += 1
+            done -= 1
+            gap_since = time.monotonic() if pending else None
+        return records, (generation, done, frozenset(pending), gap_since), reset
+
+    def rewrite(self, transform):
+        """Replaces every stored record with `transform(records)` (same length and order)."""
+        docs = list(self.collection.find({}).sort([('seq', 1), ('_id', 1)]))
+        ids = [doc.pop('_id') for doc in docs]
+        seqs = [doc.pop('seq', None) for doc in docs]
+        new_records = transform(docs)
+        if len(new_records) != len(ids):
+            raise ValueError("MongoDB rewrite requires the transform to keep one record per submission.")
+        from pymongo import ReplaceOne
+        operations = [ReplaceOne({'_id': _id}, _numbered(_document(record), seq))
+                      for _id, seq, record in zip(ids, seqs, new_records)]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+        # Bump the generation so incremental readers rebuild instead of keeping stale records.
+        self.meta.update_one({'_id': 'submissions'}, {'$inc': {'generation': 1}}, upsert=True)
+
+
+class MongoBackend:
+    """MongoDB backend: one pooled client per process, quizzes and submissions as collections."""
+
+    def __init__(self, uri=DEFAULT_MONGODB_URI, database=DEFAULT_MONGODB_DATABASE, client=None):
+        self.client = client if client is not None else get_mongo_client(uri)
+        self.database = self.client[database]
+        self.name = f"mongo:{uri}/{database}"
+        self.quizzes = self.database['quizzes']
+        self.meta = self.database['meta']
+        self.quizzes.create_index('quiz_id', unique=True)
+        self.submissions = MongoSubmissionStore(self.database)
+
+    def quizzes_version(self):
+        doc = self.meta.find_one({'_id': 'quizzes'})
+        return doc.get('version', 0) if doc else 0
+
+    def load_quizzes(self):
+        return list(self.quizzes.find({}, {'_id': 0}).sort('_id', 1))
+
+    def _bump_version(self):
+        self.meta.update_one({'_id': 'quizzes'}, {'$inc': {'version': 1}}, upsert=True)
+
+    def create_quiz(self, quiz):
+        quiz_id = new_quiz_id()
+        self.quizzes.insert_one(dict(quiz, quiz_id=quiz_id, created_at=time.time()))
+        self._bump_version()
+        return quiz_id
+
+    def update_quiz(self, quiz_id, quiz):
+        result = self.quizzes.replace_one({'quiz_id': quiz_id}, dict(quiz, quiz_id=quiz_id))
+        if not result.matched_count:
+            raise KeyError(quiz_id)
+        self._bump_version()
+
+
+def create_backend(quiz_file_path, submissions_file_path):
+    """Builds the backend selected by PAO_STORAGE_BACKEND ("file", the default, or "mongo")."""
+    backend = os.getenv("PAO_STORAGE_BACKEND", "file").lower()
+    if backend == "mongo":
+        return MongoBackend(
+            uri=os.getenv("MONGODB_URI", DEFAULT_MONGODB_URI),
+            database=os.getenv("MONGODB_DATABASE", DEFAULT_MONGODB_DATABASE),
+        )
+    if backend != "file":
+        raise ValueError(f"Unknown PAO_STORAGE_BACKEND '{backend}'; expected 'file' or 'mongo'.")
+    return FileBackend(quiz_file_path, submissions_file_path)
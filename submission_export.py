@@ -0,0 +1,219 @@
+"""Columnar export of quiz submissions for reporting and archival.
+
+Submissions are written to an uncompressed Arrow IPC file (Feather v2), one row per
+submission, with the answers packed into a fixed-width uint8 column: byte q is the
+ASCII code of the option chosen for question q (e.g. 65 for "A"), 0 if unanswered.
+Reading memory-maps the file, so loading a term's worth of submissions costs little
+more than the columns actually touched.
+
+    python submission_export.py --output term-2026-autumn.arrow
+    python submission_export.py --summary term-2026-autumn.arrow
+"""
+import argparse
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+import grading
+import storage
+
+BATCH_ROWS = 65536 # Submissions converted and written per record batch
+ASCII_OPTION_KEYS = [chr(code) for code in range(1, 128)] # Makes grading.answer_matrix emit ASCII codes
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc # noqa: F401
+    except ImportError:
+        raise RuntimeError("Exporting submissions requires the 'pyarrow' package.")
+    return pyarrow
+
+
+def _packable(answers, width):
+    """Returns `answers` keyed by int question index without blanks, or None if some answer can't be packed."""
+    try:
+        answers = {int(q_num): answer for q_num, answer in answers.items() if answer not in (None, "")}
+    except (AttributeError, TypeError, ValueError):
+        return None
+    for q_num, answer in answers.items():
+        if not 0 <= q_num < width or not isinstance(answer, str) or len(answer) != 1 or not 0 < ord(answer) < 128:
+            return None
+    return answers
+
+
+def _pack_answers(rows, width, quizzes_by_id):
+    """Packs the answers of a batch of submissions into a (rows x width) uint8 ASCII matrix.
+
+    Returns the matrix and the positions of rows whose answers couldn't be packed
+    (not single-character keys, or beyond `width` questions); those are left blank.
+    """
+    packed = np.zeros((len(rows), width), dtype=np.uint8)
+    unpacked = []
+    positions_by_quiz = {}
+    for position, row in enumerate(rows):
+        positions_by_quiz.setdefault(row.get('quiz_id'), []).append(position)
+    for quiz_id, positions in positions_by_quiz.items():
+        answer_dicts = [rows[position].get('answers') or {} for position in positions]
+        quiz = quizzes_by_id.get(quiz_id)
+        if quiz is not None:
+            num_questions = len(quiz.get('questions', []))
+        else: # Quiz no longer in the catalog; trust the recorded question count
+            num_questions = max(rows[position].get('total_questions') or 0 for position in positions)
+        num_questions = min(num_questions, width)
+        if num_questions:
+            try:
+                matrix = grading.answer_matrix(answer_dicts, num_questions, ASCII_OPTION_KEYS)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                matrix = None
+            if matrix is not None and np.count_nonzero(matrix) == sum(map(len, answer_dicts)):
+                packed[positions, :num_questions] = matrix
+                continue
+        # Slow path, e.g. the quiz lost questions after it was answered: check each submission
+        # and size the quiz from the highest answered question instead of failing the export.
+        answer_dicts = [_packable(answers, width) for answers in answer_dicts]
+        unpacked.extend(position for position, answers in zip(positions, answer_dicts) if answers is None)
+        answer_dicts = [answers or {} for answers in answer_dicts]
+        num_questions = max([num_questions] + [max(answers) + 1 for answers in answer_dicts if answers])
+        if num_questions:
+            packed[positions, :num_questions] = grading.answer_matrix(answer_dicts, num_questions, ASCII_OPTION_KEYS)
+    return packed, unpacked
+
+
+def _record_batch(pa, rows, width, quizzes_by_id, skipped):
+    answers, unpacked = _pack_answers(rows, width, quizzes_by_id)
+    if skipped is not None:
+        skipped.extend(rows[position] for position in unpacked)
+    return pa.record_batch([
+        pa.array([row.get('quiz_id') for row in rows], pa.string()),
+        pa.array([row.get('quiz_title') for row in rows], pa.string()),
+        pa.array([row.get('student_id') for row in rows], pa.string()),
+        pa.array([row.get('score') for row in rows], pa.int32()),
+        pa.array([row.get('total_questions') for row in rows], pa.int32()),
+        pa.array([row.get('submission_timestamp') for row in rows], pa.float64()),
+        pa.FixedSizeListArray.from_arrays(pa.array(answers.ravel(), pa.uint8()), width),
+    ], schema=_schema(pa, width))
+
+
+def _schema(pa, width):
+    return pa.schema([
+        ('quiz_id', pa.string()),
+        ('quiz_title', pa.string()),
+        ('student_id', pa.string()),
+        ('score', pa.int32()),
+        ('total_questions', pa.int32()),
+        ('submission_timestamp', pa.float64()),
+        ('answers', pa.list_(pa.uint8(), width)),
+    ])
+
+
+def export_submissions(records, path, quizzes_by_id=None, width=None, batch_rows=BATCH_ROWS, skipped=None):
+    """Writes submission records (any iterable, streamed in batches) to an Arrow IPC file at `path`.
+
+    `quizzes_by_id` gives each quiz's question count; the answers column is as wide as
+    the largest quiz unless `width` is given. A submission whose answers can't be packed
+    is still exported, with blank answers, and appended to the `skipped` list if one is
+    given. Returns the number of rows written.
+    """
+    pa = _pyarrow()
+    quizzes_by_id = quizzes_by_id or {}
+    if width is None:
+        width = max([len(quiz.get('questions', [])) for quiz in quizzes_by_id.values()] + [1])
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    total = 0
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, _schema(pa, width)) as writer:
+        rows = []
+        for record in records:
+            rows.append(record)
+            if len(rows) >= batch_rows:
+                writer.write_batch(_record_batch(pa, rows, width, quizzes_by_id, skipped))
+                total += len(rows)
+                rows = []
+        if rows:
+            writer.write_batch(_record_batch(pa, rows, width, quizzes_by_id, skipped))
+            total += len(rows)
+    os.replace(tmp_path, path) # Readers never see a half-written export
+    return total
+
+
+def open_export(path):
+    """Memory-maps an export and returns it as a pyarrow Table (no data is copied or parsed)."""
+    pa = _pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _chunk_matrix(chunk):
+    """Returns one record batch's answers as a (rows x width) view of the mapped file (no copy)."""
+    return chunk.flatten().to_numpy().reshape(-1, chunk.type.list_size)
+
+
+def answers_matrix(table):
+    """Returns the answers column as a (rows x width) uint8 array of ASCII option codes.
+
+    The array is a view of the mapped file when the export holds a single record batch
+    (at most `batch_rows` submissions); larger exports are copied into one array. Use
+    `analyze` for per-quiz work, which only copies the rows of that quiz.
+    """
+    column = table.column('answers')
+    if column.num_chunks == 0:
+        return np.empty((0, column.type.list_size), dtype=np.uint8)
+    if column.num_chunks == 1:
+        return _chunk_matrix(column.chunk(0))
+    return np.concatenate([_chunk_matrix(chunk) for chunk in column.chunks])
+
+
+def analyze(table, quiz, quiz_id):
+    """Runs grading.analyze_matrix over the exported submissions of one quiz."""
+    _pyarrow()
+    import pyarrow.compute as pc
+    option_keys = grading.option_keys_for(quiz)
+    num_questions = len(quiz.get('questions', []))
+    # Record batch by record batch, so only this quiz's rows (and questions) are copied out of the mapping.
+    selected = []
+    for batch in table.to_batches():
+        rows = np.flatnonzero(pc.equal(batch.column('quiz_id'), quiz_id).to_numpy(zero_copy_only=False))
+        if len(rows):
+            selected.append(_chunk_matrix(batch.column('answers'))[rows, :num_questions])
+    ascii_matrix = np.concatenate(selected) if selected else np.zeros((0, num_questions), dtype=np.uint8)
+    # Translate ASCII codes to the 1-based option codes used by the grading engine.
+    lookup = np.zeros(256, dtype=np.uint8)
+    for code, option_key in enumerate(option_keys, start=1):
+        if len(option_key) == 1 and option_key.isascii():
+            lookup[ord(option_key)] = code
+    return grading.analyze_matrix(quiz, lookup[ascii_matrix], option_keys)
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Export submissions to a columnar Arrow file, or summarize an export.")
+    parser.add_argument("--output", help="Arrow IPC file to write")
+    parser.add_argument("--summary", help="existing export to summarize")
+    parser.add_argument("--width", type=int, help="answers per row (default: the largest quiz)")
+    parser.add_argument("--quiz-file", default="quiz_data.json")
+    parser.add_argument("--submissions-file", default="quiz_submissions.json")
+    args = parser.parse_args()
+    if not args.output and not args.summary:
+        parser.error("one of --output or --summary is required")
+
+    if args.output:
+        backend = storage.create_backend(args.quiz_file, args.submissions_file)
+        quizzes_by_id = {quiz['quiz_id']: quiz for quiz in backend.load_quizzes() if quiz.get('quiz_id')}
+        skipped = []
+        written = export_submissions(backend.submissions.iter_records(), args.output, quizzes_by_id,
+                                     width=args.width, skipped=skipped)
+        print(f"Exported {written} submissions to {args.output} ({os.path.getsize(args.output)} bytes)")
+        for record in skipped:
+            print(f"  answers not exported (not single-character keys, or beyond --width): "
+                  f"student '{record.get('student_id')}', quiz '{record.get('quiz_id')}'")
+    if args.summary:
+        table = open_export(args.summary)
+        frame = table.drop_columns(['answers']).to_pandas()
+        print(f"{table.num_rows} submissions, {table.column('answers').type.list_size} answers per row")
+        if table.num_rows:
+            print(frame.groupby('quiz_title')['score'].agg(['count', 'mean', 'min', 'max']).to_string())
+
+
+if __name__ == "__main__":
+    main()
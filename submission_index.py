@@ -0,0 +1,107 @@
+import sys
+import threading
+from bisect import insort
+from collections import defaultdict
+
+
+def _timestamp(record):
+    try:
+        return float(record.get('submission_timestamp', 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# The only submission fields the dashboard lists; answers stay in the log.
+DISPLAY_FIELDS = ('student_id', 'quiz_id', 'quiz_title', 'score', 'total_questions', 'submission_time_str')
+_SHARED_FIELDS = ('student_id', 'quiz_id', 'quiz_title') # Repeated across submissions, so interned
+
+
+def _display_row(record):
+    row = []
+    for field in DISPLAY_FIELDS:
+        value = record.get(field)
+        if field in _SHARED_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        row.append(value)
+    return tuple(row)
+
+
+class SubmissionIndex:
+    """Timestamp-ordered, in-memory index over a SubmissionLog.
+
+    `refresh()` only reads submissions appended since the previous call, and a page
+    is a slice from the newest end of an index list, so rendering a page costs
+    O(page size) however many submissions exist. Filters on quiz_id and/or
+    student_id are served by secondary indexes kept in the same order.
+
+    Only DISPLAY_FIELDS are kept per submission, so the index stays small however
+    many answers each submission has; read answers from the log itself.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._cursor = None
+        self._rows = [] # DISPLAY_FIELDS tuples in append order; index entries refer to positions in this list
+        self._by_time = []
+        self._by_quiz = defaultdict(list)
+        self._by_student = defaultdict(list)
+        self._by_quiz_student = defaultdict(list)
+
+    def _add(self, record):
+        entry = (_timestamp(record), len(self._rows))
+        self._rows.append(_display_row(record))
+        quiz_id = record.get('quiz_id')
+        student_id = record.get('student_id')
+        for entries in (self._by_time, self._by_quiz[quiz_id], self._by_student[student_id],
+                        self._by_quiz_student[(quiz_id, student_id)]):
+            # Submissions arrive almost in timestamp order, so this is nearly always an append.
+            if not entries or entries[-1] <= entry:
+                entries.append(entry)
+            else:
+                insort(entries, entry)
+
+    def refresh(self):
+        """Indexes submissions appended since the last refresh. Returns how many were added."""
+        with self._lock:
+            records, cursor, reset = self.log.read_since(self._cursor)
+            if reset:
+                self._reset()
+            for record in records:
+                self._add(record)
+            self._cursor = cursor
+            return len(records)
+
+    def _entries(self, quiz_id=None, student_id=None):
+        if quiz_id is not None and student_id is not None:
+            return self._by_quiz_student.get((quiz_id, student_id), [])
+        if quiz_id is not None:
+            return self._by_quiz.get(quiz_id, [])
+        if student_id is not None:
+            return self._by_student.get(student_id, [])
+        return self._by_time
+
+    def count(self, quiz_id=None, student_id=None):
+        with self._lock:
+            return len(self._entries(quiz_id, student_id))
+
+    def page(self, page_number, page_size, quiz_id=None, student_id=None):
+        """Returns one page of submissions (DISPLAY_FIELDS only), newest first. `page_number` starts at 0."""
+        with self._lock:
+            entries = self._entries(quiz_id, student_id)
+            end = len(entries) - page_number * page_size
+            if end <= 0:
+                return []
+            start = max(end - page_size, 0)
+            return [dict(zip(DISPLAY_FIELDS, self._rows[position])) for _, position in reversed(entries[start:end])]
+
+    def quiz_ids(self):
+        with self._lock:
+            return sorted(key for key in self._by_quiz if key is not None)
+
+    def student_ids(self):
+        with self._lock:
+            return sorted(key for key in self._by_student if key is not None)
@@ -0,0 +1,379 @@
+import json
+import os
+import threading
+import time
+
+import metrics
+
+try:
+    import fcntl  # POSIX advisory locks; not available on Windows
+except ImportError:
+    fcntl = None
+
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".jsonl"
+LOCK_FILE_NAME = "LOCK"
+
+
+def _segment_name(segment_no):
+    return f"{SEGMENT_PREFIX}{segment_no:06d}{SEGMENT_SUFFIX}"
+
+
+def _encode(record):
+    """Serializes one record as a single compact JSON line."""
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _fsync_dir(directory):
+    """Makes renames/creates inside a directory durable (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SubmissionLog:
+    """Append-only JSON-lines log of quiz submissions, split into numbered segments.
+
+    Each submit writes exactly one line to the active segment, so its cost does not
+    depend on how many submissions already exist. Writers are serialized with a
+    thread lock plus an advisory file lock, so several sessions (or processes) can
+    submit at the same time without losing each other's records.
+    """
+
+    def __init__(self, directory, legacy_path=None, segment_max_bytes=4 * 1024 * 1024,
+                 fsync_every=32, fsync_interval=1.0):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._thread_lock = threading.RLock()
+        self._active_no = None
+        self._active_fd = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._flush_timer = None
+
+        if not os.path.isdir(directory):
+            self._create(legacy_path)
+        self._lock_fd = os.open(os.path.join(directory, LOCK_FILE_NAME), os.O_RDWR | os.O_CREAT, 0o644)
+
+    # --- Setup / migration ---
+    def _create(self, legacy_path):
+        """Creates the log directory, importing the old list-format JSON file if present."""
+        legacy_records = []
+        if legacy_path and os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "r") as f:
+                    data = json.load(f)
+                if isinstance(data, list):
+                    legacy_records = [rec for rec in data if isinstance(rec, dict)]
+            except (OSError, ValueError):
+                legacy_records = []  # Unreadable legacy file: start with an empty log
+
+        # Build the directory under a temporary name and rename it into place, so a
+        # concurrent process never sees a half-migrated log.
+        tmp_dir = f"{self.directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        with open(os.path.join(tmp_dir, _segment_name(1)), "wb") as f:
+            f.write(b"".join(_encode(rec) for rec in legacy_records))
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.rename(tmp_dir, self.directory)
+        except OSError:
+            # Another process created the log first; discard our copy.
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+        parent = os.path.dirname(os.path.abspath(self.directory))
+        _fsync_dir(parent)
+
+    # --- Locking helpers ---
+    def _lock(self, exclusive=True):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    # --- Segment helpers ---
+    def segment_numbers(self):
+        """Returns the existing segment numbers in ascending order."""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    pass
+        return sorted(numbers)
+
+    def _segment_path(self, segment_no):
+        return os.path.join(self.directory, _segment_name(segment_no))
+
+    def _close_active(self):
+        if self._active_fd is not None:
+            if self._unsynced:
+                os.fsync(self._active_fd)
+                self._unsynced = 0
+            os.close(self._active_fd)
+            self._active_fd = None
+            self._active_no = None
+
+    def _open_active(self):
+        """Opens (or follows) the newest segment, rolling over once it is full. Caller holds the lock."""
+        # Re-resolve the newest segment if another writer rolled over past ours, or if
+        # ours was removed by a rewrite since we last wrote.
+        if self._active_no is not None and (
+                os.path.exists(self._segment_path(self._active_no + 1))
+                or not os.path.exists(self._segment_path(self._active_no))):
+            self._close_active()
+        if self._active_no is None:
+            numbers = self.segment_numbers()
+            self._active_no = numbers[-1] if numbers else 1
+            self._active_fd = os.open(self._segment_path(self._active_no),
+                                      os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._active_fd).st_size >= self.segment_max_bytes:
+            next_no = self._active_no + 1
+            self._close_active()
+            self._active_no = next_no
+            self._active_fd = os.open(self._segment_path(next_no), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            _fsync_dir(self.directory)
+        return self._active_fd
+
+    def _maybe_fsync(self, fd, force=False):
+        """Batches fsyncs: one per `fsync_every` appends or `fsync_interval` seconds.
+
+        Records left unsynced are flushed by a timer once `fsync_interval` has passed,
+        even if no further append arrives. Caller holds the lock.
+        """
+        now = time.monotonic()
+        if force or self._unsynced >= self.fsync_every or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(fd)
+            self._unsynced = 0
+            self._last_fsync = now
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.fsync_interval - (now - self._last_fsync), self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._thread_lock:
+            self._flush_timer = None
+            if self._lock_fd is not None: # Not closed in the meantime
+                self.flush()
+
+    # --- Public API ---
+    def append(self, record, sync=False):
+        """Appends a single submission record. O(1) in the number of stored submissions."""
+        self.append_many([record], sync=sync)
+
+    def append_many(self, records, sync=False):
+        """Appends several records with one write call (and at most one fsync)."""
+        payload = b"".join(_encode(rec) for rec in records)
+        if not payload:
+            return
+        self._lock()
+        try:
+            fd = self._open_active()
+            os.write(fd, payload)
+            metrics.count_write("submissions", len(payload))
+            self._unsynced += len(records)
+            self._maybe_fsync(fd, force=sync)
+        finally:
+            self._unlock()
+
+    def flush(self):
+        """Forces any batched writes to disk."""
+        self._lock()
+        try:
+            if self._active_fd is not None and self._unsynced:
+                self._maybe_fsync(self._active_fd, force=True)
+        finally:
+            self._unlock()
+
+    def close(self):
+        self._lock()
+        try:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._close_active()
+        finally:
+            self._unlock()
+        with self._thread_lock:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _read_segment(self, segment_no, records):
+        try:
+            with open(self._segment_path(segment_no), "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Torn final line from an interrupted write; ignore it
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Skip a corrupted line rather than losing the whole log
+                metrics.count_read("submissions", f.tell())
+        except FileNotFoundError:
+            pass  # Removed by a concurrent compaction after we listed it
+
+    def read_all(self):
+        """Returns every stored submission in append order."""
+        records = []
+        self._lock(exclusive=False)
+        try:
+            for segment_no in self.segment_numbers():
+                self._read_segment(segment_no, records)
+        finally:
+            self._unlock()
+        return records
+
+    def iter_records(self):
+        """Yields every stored submission in append order without loading them all at once.
+
+        Segments are opened (and the active one's size noted) under the lock, then read
+        after releasing it: the open files keep a consistent snapshot even if a
+        compaction replaces them, and writers are not blocked for the whole read.
+        """
+        snapshot = []
+        self._lock(exclusive=False)
+        try:
+            for segment_no in self.segment_numbers():
+                try:
+                    f = open(self._segment_path(segment_no), "rb")
+                except FileNotFoundError:
+                    continue
+                snapshot.append((f, os.fstat(f.fileno()).st_size))
+        finally:
+            self._unlock()
+        try:
+            for f, size in snapshot:
+                position = 0
+                for line in f:
+                    position += len(line)
+                    if position > size or not line.endswith(b"\n"):
+                        break  # Appended after the snapshot, or a torn final line
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+                metrics.count_read("submissions", min(position, size))
+        finally:
+            for f, _ in snapshot:
+                f.close()
+
+    def read_since(self, cursor=None):
+        """Returns `(records, cursor, reset)` for submissions appended after `cursor`.
+
+        Cursors are opaque values returned by a previous call. If the log was compacted
+        since then, the cursor no longer points at the same bytes; in that case the
+        whole log is returned with `reset=True` so the caller can rebuild its state.
+        """
+        records = []
+        self._lock(exclusive=False)
+        try:
+            numbers = self.segment_numbers()
+            reset = cursor is None
+            if cursor is not None:
+                segment_no, offset, inode = cursor
+                try:
+                    reset = os.stat(self._segment_path(segment_no)).st_ino != inode
+                except FileNotFoundError:
+                    reset = True
+            if reset:
+                segment_no, offset = (numbers[0] if numbers else 1), 0
+
+            new_cursor = cursor
+            for number in numbers:
+                if number < segment_no:
+                    continue
+                start = offset if number == segment_no else 0
+                try:
+                    with open(self._segment_path(number), "rb") as f:
+                        inode = os.fstat(f.fileno()).st_ino
+                        f.seek(start)
+                        position = start
+                        for line in f:
+                            if not line.endswith(b"\n"):
+                                break  # Incomplete line; pick it up on a later call
+                            position += len(line)
+                            try:
+                                records.append(json.loads(line))
+                            except ValueError:
+                                continue
+                        metrics.count_read("submissions", position - start)
+                except FileNotFoundError:
+                    continue
+                new_cursor = (number, position, inode)
+            return records, new_cursor, reset
+        finally:
+            self._unlock()
+
+    def compact(self):
+        """Merges all closed segments into one, atomically replacing them.
+
+        The newest (active) segment is left alone so writers are never blocked on
+        a large rewrite. Returns the number of segments that were merged away.
+        """
+        self._lock()
+        try:
+            numbers = self.segment_numbers()
+            closed = numbers[:-1]
+            if len(closed) < 2:
+                return 0
+            records = []
+            for segment_no in closed:
+                self._read_segment(segment_no, records)
+            target_no = closed[-1]
+            tmp_path = self._segment_path(target_no) + ".compact"
+            with open(tmp_path, "wb") as f:
+                metrics.count_write("submissions", f.write(b"".join(_encode(rec) for rec in records)))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._segment_path(target_no))
+            for segment_no in closed[:-1]:
+                os.remove(self._segment_path(segment_no))
+            _fsync_dir(self.directory)
+            return len(closed) - 1
+        finally:
+            self._unlock()
+
+    def rewrite(self, transform):
+        """Atomically replaces the whole log with `transform(records)`.
+
+        Used for rare maintenance such as re-grading; writers are blocked for the
+        duration and resume on the new segment afterwards.
+        """
+        self._lock()
+        try:
+            numbers = self.segment_numbers()
+            records = []
+            for segment_no in numbers:
+                self._read_segment(segment_no, records)
+            new_records = transform(records)
+            target_no = (numbers[-1] if numbers else 0) + 1
+            tmp_path = self._segment_path(target_no) + ".rewrite"
+            with open(tmp_path, "wb") as f:
+                metrics.count_write("submissions", f.write(b"".join(_encode(rec) for rec in new_records)))
+                f.flush()
+                os.fsync(f.fileno())
+            self._close_active()
+            os.replace(tmp_path, self._segment_path(target_no))
+            for segment_no in numbers:
+                os.remove(self._segment_path(segment_no))
+            _fsync_dir(self.directory)
+        finally:
+            self._unlock()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from http import HTTPStatus
+
+import pytest
+
+import api
+import attempt_store
+import storage
+
+QUIZ_ID = "quiz_api_test"
+
+
+@pytest.fixture
+def quiz_api(tmp_path):
+    quiz = {
+        "quiz_id": QUIZ_ID,
+        "title": "API Test Quiz",
+        "questions": [{"question_text": f"Q{q}?", "options": {"A": "a", "B": "b"}, "correct_answer": "B"}
+                      for q in range(3)],
+        "duration": 10,
+        "start_date": str(date.today() - timedelta(days=1)),
+        "start_time": "09:00:00",
+    }
+    quiz_path = tmp_path / "quiz_data.json"
+    quiz_path.write_text(json.dumps([quiz]))
+    backend = storage.FileBackend(str(quiz_path), str(tmp_path / "quiz_submissions.json"))
+    return api.QuizAPI(backend, attempt_store.MemoryAttemptStore())
+
+
+def call(quiz_api, path, payload):
+    async def run():
+        await quiz_api.start()
+        try:
+            return await quiz_api.route('POST', path, json.dumps(payload).encode())
+        except api.HTTPError as e:
+            return e.status, e.message
+    return asyncio.run(run())
+
+
+def start(quiz_api, student_id="s1"):
+    return call(quiz_api, f"/quizzes/{QUIZ_ID}/attempts", {"student_id": student_id})
+
+
+def submit(quiz_api, answers, student_id="s1"):
+    return call(quiz_api, f"/quizzes/{QUIZ_ID}/submissions", {"student_id": student_id, "answers": answers})
+
+
+def test_submit_requires_a_started_attempt(quiz_api):
+    status, _ = submit(quiz_api, {"0": "B"})
+    assert status == HTTPStatus.CONFLICT
+
+
+def test_one_submission_per_attempt(quiz_api):
+    status, started = start(quiz_api)
+    assert status == HTTPStatus.OK and len(started["questions"]) == 3
+    assert "correct_answer" not in started["questions"][0]
+
+    status, result = submit(quiz_api, {"0": "B", "1": "B", "2": "A"})
+    assert status == HTTPStatus.CREATED and result["score"] == 2
+    assert submit(quiz_api, {"0": "B"})[0] == HTTPStatus.CONFLICT
+    assert start(quiz_api)[0] == HTTPStatus.CONFLICT
+    assert len(quiz_api.backend.submissions.read_all()) == 1
+
+
+@pytest.mark.parametrize("answer", ["BB", "", "C", ["B"], {"B": 1}, 1])
+def test_answers_must_be_option_keys(quiz_api, answer):
+    start(quiz_api)
+    status, _ = submit(quiz_api, {"0": "", "1": answer, "2": "B"})
+    assert status == HTTPStatus.BAD_REQUEST
+    assert quiz_api.backend.submissions.read_all() == []
+
+
+def test_submission_after_the_deadline_times_out(quiz_api):
+    quiz_api.attempts.start("s1", QUIZ_ID, time.time() - 11 * 60)
+    status, _ = submit(quiz_api, {"0": "B"})
+    assert status == HTTPStatus.CONFLICT
+    assert quiz_api.attempts.get("s1", QUIZ_ID)["status"] == "timed_out"
+    assert quiz_api.backend.submissions.read_all() == []
+
+
+def raw_request(quiz_api, request):
+    async def run():
+        await quiz_api.start()
+        server = await asyncio.start_server(quiz_api.handle_connection, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "+3", "", "²"])
+def test_invalid_content_length_is_a_bad_request(quiz_api, length):
+    request = f"POST /quizzes/{QUIZ_ID}/attempts HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}"
+    response = raw_request(quiz_api, request.encode('latin-1'))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Invalid Content-Length" in response
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import attempt_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return attempt_store.MemoryAttemptStore(ttl_seconds=60)
+    return attempt_store.SQLiteAttemptStore(str(tmp_path / "attempts.sqlite3"), ttl_seconds=60)
+
+
+def age(store, student_id, quiz_id, seconds):
+    """Pretends the attempt was last touched `seconds` ago."""
+    if isinstance(store, attempt_store.MemoryAttemptStore):
+        key = (student_id, quiz_id)
+        (store._attempts.get(key) or store._finished[key])["updated_at"] -= seconds
+    else:
+        with store._connection() as conn:
+            conn.execute("UPDATE attempts SET updated_at = updated_at - ? WHERE student_id = ? AND quiz_id = ?",
+                         (seconds, student_id, quiz_id))
+
+
+def test_resume_and_save_answers(store):
+    store.start("s1", "q1", 100.0)
+    store.save_answers("s1", "q1", {0: "A", 2: "C"})
+    store.save_answers("s1", "q1", {2: "D"})
+    attempt = store.start("s1", "q1", 200.0) # e.g. a second tab
+    assert attempt["started_at"] == 100.0
+    assert attempt["answers"] == {0: "A", 2: "D"}
+
+
+def test_expired_attempts_time_out_instead_of_restarting(store):
+    store.start("s1", "q1", 100.0)
+    store.save_answers("s1", "q1", {0: "A"})
+    age(store, "s1", "q1", 120)
+    assert store.get("s1", "q1")["status"] == "timed_out"
+    store.gc()
+    attempt = store.start("s1", "q1", 300.0)
+    assert attempt["status"] == "timed_out" and attempt["started_at"] == 100.0
+    store.save_answers("s1", "q1", {1: "B"})
+    assert 1 not in store.get("s1", "q1")["answers"]
+
+
+def test_evicted_attempts_time_out():
+    store = attempt_store.MemoryAttemptStore(max_attempts=1)
+    store.start("s1", "q1", 100.0)
+    store.start("s2", "q1", 100.0)
+    assert store.get("s1", "q1")["status"] == "timed_out"
+    assert store.start("s1", "q1", 300.0)["started_at"] == 100.0
+    assert store.get("s2", "q1")["status"] == "in_progress"
+
+
+@pytest.mark.parametrize("status", ["submitted", "timed_out"])
+def test_finished_attempts_do_not_expire(store, status):
+    store.start("s1", "q1", 100.0)
+    store.finish("s1", "q1", status, {0: "A"}, 1, 3)
+    age(store, "s1", "q1", 120)
+    store.gc()
+    attempt = store.start("s1", "q1", 300.0)
+    assert attempt["status"] == status
+    assert attempt["started_at"] == 100.0
+    assert store.get("s1", "q1")["answers"] == {0: "A"}
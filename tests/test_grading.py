@@ -0,0 +1,32 @@
+import numpy as np
+
+import grading
+
+
+def make_quiz(num_questions=3, correct="B"):
+    return {"questions": [{"question_text": f"Q{q}?", "options": {"A": "a", "B": "b", "C": "c", "D": "d"},
+                           "correct_answer": correct} for q in range(num_questions)]}
+
+
+def test_score_answers_accepts_int_and_str_keys():
+    quiz = make_quiz()
+    assert grading.score_answers(quiz, {0: "B", 1: "B", 2: "A"}) == 2
+    assert grading.score_answers(quiz, {"0": "B", "1": "C", "2": "B"}) == 2
+    assert grading.score_answers(quiz, {}) == 0
+
+
+def test_multi_character_answer_does_not_shift_other_cells():
+    quiz = make_quiz()
+    assert grading.score_answers(quiz, {0: "", 1: "BB", 2: "B"}) == 1
+
+    submissions = [{"quiz_id": "q", "answers": {"0": "", "1": "BB", "2": "B"}},
+                   {"quiz_id": "q", "answers": {"0": "A", "1": "A", "2": "A"}}]
+    analysis = grading.analyze(quiz, submissions)
+    assert analysis["scores"].tolist() == [1, 0]
+    assert [record["score"] for record in grading.regrade(quiz, "q", submissions)] == [1, 0]
+
+
+def test_answer_matrix_codes_and_blanks():
+    matrix = grading.answer_matrix([{"0": "A", "1": "D"}, {}], 2, ["A", "B", "C", "D"])
+    assert matrix.dtype == np.uint8
+    assert matrix.tolist() == [[1, 4], [0, 0]]
@@ -0,0 +1,38 @@
+import sys
+import threading
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def profiled(monkeypatch):
+    monkeypatch.setenv("PAO_METRICS", "1")
+    monkeypatch.setenv("PAO_PROFILE_SAMPLE_RATE", "1")
+    metrics.configure()
+    metrics.reset_profile()
+    yield
+    monkeypatch.undo()
+    metrics.configure()
+    metrics.reset_profile()
+
+
+def test_interrupted_rerun_profile_is_stopped_and_kept(profiled):
+    metrics.begin_rerun()
+    sum(range(1000))
+    # The run is cut short (e.g. by a RerunException), so end_rerun never runs.
+    metrics.begin_rerun()
+    metrics.end_rerun()
+    assert sys.getprofile() is None
+    profiled_reruns, rows = metrics.profile_summary()
+    assert profiled_reruns == 2 and rows
+
+
+def test_profile_of_a_finished_thread_is_collected(profiled):
+    thread = threading.Thread(target=metrics.begin_rerun)
+    thread.start()
+    thread.join()
+    metrics.begin_rerun()
+    metrics.end_rerun()
+    assert metrics.profile_summary()[0] == 2
@@ -0,0 +1,26 @@
+import pytest
+
+from quiz_generation import OPTION_KEYS, local_questions
+
+NOUNS = ["mitochondria", "chloroplast", "ribosome", "nucleus", "membrane", "cytoplasm", "vacuole",
+         "lysosome", "centrosome", "flagellum", "peroxisome", "endosome", "cytoskeleton", "nucleolus", "vesicle"]
+
+
+def chunk_with_keywords(count):
+    return " ".join(f"We saw the {noun} and it was not a big one at all, so we ran off." for noun in NOUNS[:count])
+
+
+@pytest.mark.parametrize("num_keywords", [8, 15]) # Distractor pools of 7 and 14 words
+def test_local_questions_with_pool_size_multiple_of_seven(num_keywords):
+    questions = local_questions(chunk_with_keywords(num_keywords), 5)
+    assert len(questions) == 5
+    for question in questions:
+        choices = list(question["options"].values())
+        assert list(question["options"]) == list(OPTION_KEYS)
+        assert len(set(choices)) == len(OPTION_KEYS)
+        assert question["correct_answer"] in OPTION_KEYS
+
+
+def test_local_questions_is_deterministic():
+    text = chunk_with_keywords(10)
+    assert local_questions(text, 5) == local_questions(text, 5)
@@ -0,0 +1,45 @@
+import json
+import os
+
+import pytest
+
+import quiz_store
+from quiz_store import QuizStore
+
+LEGACY_TITLES = ["Bio/Chem quiz", "..", "Química básica", "Cells", "Cells"]
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    path = tmp_path / "quiz_data.json"
+    path.write_text(json.dumps([{"title": title, "questions": []} for title in LEGACY_TITLES]))
+    return str(path)
+
+
+def test_migrates_legacy_titles_that_are_not_file_names(tmp_path, legacy_path):
+    store = QuizStore(str(tmp_path / "quiz_data_store"), legacy_path=legacy_path)
+    quizzes = store.load_all()
+    assert [quiz["title"] for quiz in quizzes] == LEGACY_TITLES
+    assert [quiz["quiz_id"] for quiz in quizzes] == [
+        "quiz_bio/chem_quiz", "quiz_..", "quiz_química_básica", "quiz_cells", "quiz_cells_2"]
+    assert sorted(os.listdir(tmp_path)) == ["quiz_data.json", "quiz_data_store"]
+
+    store.update("quiz_bio/chem_quiz", {"title": "Bio/Chem quiz", "questions": [], "duration": 5})
+    assert store.load_all()[0]["duration"] == 5
+    with pytest.raises(KeyError):
+        store.update("quiz_missing", {"title": "Missing"})
+
+
+def test_failed_migration_leaves_no_temporary_directory(tmp_path, legacy_path, monkeypatch):
+    def fail(path, data):
+        raise OSError("disk full")
+    monkeypatch.setattr(quiz_store, "_write_atomically", fail)
+    with pytest.raises(OSError):
+        QuizStore(str(tmp_path / "quiz_data_store"), legacy_path=legacy_path)
+    assert sorted(os.listdir(tmp_path)) == ["quiz_data.json"]
+
+
+def test_create_uses_generated_ids(tmp_path):
+    store = QuizStore(str(tmp_path / "quiz_data_store"))
+    quiz_id = store.create({"title": "New", "questions": []})
+    assert os.listdir(store.directory) == [quiz_id + ".json"]
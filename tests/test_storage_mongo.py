@@ -0,0 +1,119 @@
+import mongomock
+import pytest
+
+import storage
+from submission_index import SubmissionIndex
+
+
+@pytest.fixture
+def backend():
+    return storage.MongoBackend(client=mongomock.MongoClient(), database="pao_school_test")
+
+
+def record(student, score, quiz_id="quiz_1"):
+    return {"quiz_id": quiz_id, "student_id": student, "score": score, "total_questions": 2,
+            "answers": {"0": "A", "1": "B"}, "submission_timestamp": float(score)}
+
+
+def test_append_many_stores_records_in_order(backend):
+    store = backend.submissions
+    store.append_many([record("s1", 1), record("s2", 2)])
+    store.append(record("s3", 3))
+    store.append_many([])
+    assert [r["student_id"] for r in store.read_all()] == ["s1", "s2", "s3"]
+    assert all("_id" not in r for r in store.read_all())
+
+
+def test_append_records_shaped_like_app_and_api_submissions(backend):
+    # main.py and api.py key answers by int question index; BSON needs string keys.
+    submission = dict(record("s1", 1), answers={0: "A", 1: "B"})
+    backend.submissions.append(submission)
+    assert backend.submissions.read_all()[0]["answers"] == {"0": "A", "1": "B"}
+    assert submission["answers"] == {0: "A", 1: "B"} # The caller's record is left alone
+
+
+def test_read_since_returns_only_new_records(backend):
+    store = backend.submissions
+    store.append_many([record("s1", 1), record("s2", 2)])
+    records, cursor, reset = store.read_since()
+    assert reset and [r["student_id"] for r in records] == ["s1", "s2"]
+
+    records, cursor, reset = store.read_since(cursor)
+    assert not reset and records == []
+
+    store.append(record("s3", 3))
+    records, cursor, reset = store.read_since(cursor)
+    assert not reset and [r["student_id"] for r in records] == ["s3"]
+
+
+def test_read_since_from_an_empty_collection(backend):
+    index = SubmissionIndex(backend.submissions)
+    assert index.refresh() == 0
+    backend.submissions.append(record("s1", 1))
+    assert index.refresh() == 1
+    assert index.count() == 1
+    backend.submissions.append(record("s2", 2))
+    assert index.refresh() == 1
+    assert index.count() == 2
+
+
+def test_rewrite_replaces_records_and_resets_readers(backend):
+    store = backend.submissions
+    store.append_many([record("s1", 1), record("s2", 2)])
+    _, cursor, _ = store.read_since()
+
+    store.rewrite(lambda records: [dict(r, score=r["score"] * 10) for r in records])
+    assert [r["score"] for r in store.read_all()] == [10, 20]
+
+    records, _, reset = store.read_since(cursor)
+    assert reset and [r["score"] for r in records] == [10, 20]
+
+    with pytest.raises(ValueError):
+        store.rewrite(lambda records: records[:1])
+
+
+def test_quiz_version_bumps_on_create_and_update(backend):
+    assert backend.quizzes_version() == 0
+    quiz_id = backend.create_quiz({"title": "Cells", "questions": []})
+    assert backend.quizzes_version() == 1
+    backend.update_quiz(quiz_id, {"title": "Cells, revised", "questions": []})
+    assert backend.quizzes_version() == 2
+    assert [q["title"] for q in backend.load_quizzes()] == ["Cells, revised"]
+
+    with pytest.raises(KeyError):
+        backend.update_quiz("missing", {"title": "Nope"})
+    assert backend.quizzes_version() == 2
+
+
+def insert_numbered(store, seq, student):
+    store.collection.insert_one(dict(record(student, seq), seq=seq))
+
+
+def test_read_since_picks_up_a_batch_that_became_visible_late(backend):
+    store = backend.submissions
+    first, second = store._reserve(1)[0], store._reserve(1)[0]
+    insert_numbered(store, second, "late-reserver") # e.g. another process inserting first
+    records, cursor, _ = store.read_since()
+    assert [r["student_id"] for r in records] == ["late-reserver"]
+
+    insert_numbered(store, first, "early-reserver")
+    records, cursor, reset = store.read_since(cursor)
+    assert not reset and [r["student_id"] for r in records] == ["early-reserver"]
+    store.append(record("s3", 3))
+    records, cursor, _ = store.read_since(cursor)
+    assert [r["student_id"] for r in records] == ["s3"]
+    assert "seq" not in records[0]
+
+
+def test_read_since_skips_a_gap_that_is_never_filled(backend, monkeypatch):
+    monkeypatch.setattr(storage, "SEQUENCE_GAP_TIMEOUT", 0.0)
+    store = backend.submissions
+    store._reserve(1) # Reserved, but its insert failed
+    store.append(record("s1", 1))
+    records, cursor, _ = store.read_since()
+    assert [r["student_id"] for r in records] == ["s1"]
+    _, cursor, _ = store.read_since(cursor) # Gap has now been open longer than the timeout
+    assert cursor[1:3] == (2, frozenset())
+    store.append(record("s2", 2))
+    records, _, _ = store.read_since(cursor)
+    assert [r["student_id"] for r in records] == ["s2"]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import grading  # noqa: E402
+import submission_export  # noqa: E402
+
+QUIZ = {"quiz_id": "q1", "questions": [
+    {"question_text": f"Q{q}?", "options": {"A": "a", "B": "b", "C": "c"}, "correct_answer": "B"} for q in range(3)
+]}
+OTHER_QUIZ = {"quiz_id": "q2", "questions": QUIZ["questions"][:2]}
+
+
+def records():
+    answers = [{"0": "B", "1": "B", "2": "B"}, {"0": "A"}, {}, {"0": "C", "1": "B", "2": "A"}, {"1": "B"}]
+    rows = [{"quiz_id": "q1", "student_id": f"s{i}", "answers": a, "score": 0, "total_questions": 3,
+             "submission_timestamp": float(i)} for i, a in enumerate(answers)]
+    rows.insert(2, {"quiz_id": "q2", "student_id": "x", "answers": {"0": "B", "1": "B"}, "score": 2,
+                    "total_questions": 2, "submission_timestamp": 9.0})
+    return rows
+
+
+def export(tmp_path, rows, batch_rows=submission_export.BATCH_ROWS):
+    path = str(tmp_path / "export.arrow")
+    submission_export.export_submissions(rows, path, {"q1": QUIZ, "q2": OTHER_QUIZ}, batch_rows=batch_rows)
+    return submission_export.open_export(path)
+
+
+@pytest.mark.parametrize("batch_rows", [2, 100])
+def test_analyze_matches_grading(tmp_path, batch_rows):
+    rows = records()
+    table = export(tmp_path, rows, batch_rows)
+    expected = grading.analyze(QUIZ, [row for row in rows if row["quiz_id"] == "q1"])
+    analysis = submission_export.analyze(table, QUIZ, "q1")
+    assert analysis["scores"].tolist() == expected["scores"].tolist() == [3, 0, 0, 1, 1]
+    assert analysis["items"].equals(expected["items"])
+
+
+def test_empty_export(tmp_path):
+    table = export(tmp_path, [])
+    assert submission_export.answers_matrix(table).shape == (0, 3)
+    assert submission_export.analyze(table, QUIZ, "q1")["scores"].tolist() == []
+
+
+def test_single_batch_answers_are_not_copied(tmp_path):
+    matrix = submission_export.answers_matrix(export(tmp_path, records()))
+    assert matrix.shape == (6, 3) and not matrix.flags.owndata
+    assert matrix[0].tolist() == [ord("B")] * 3 and matrix[3].tolist() == [0, 0, 0]
+    assert np.array_equal(submission_export.answers_matrix(export(tmp_path, records(), batch_rows=2)), matrix)
+
+
+def test_unpackable_answers_are_reported_not_fatal(tmp_path):
+    rows = records()
+    rows[0]["answers"] = {"0": "B", "4": "C"}  # Answered before the quiz lost its last questions
+    rows[1]["answers"] = {"0": "BB"}
+    rows[4]["answers"] = {"0": "C", "1": "", "2": "A"}
+    path = str(tmp_path / "export.arrow")
+    skipped = []
+    written = submission_export.export_submissions(rows, path, {"q1": QUIZ, "q2": OTHER_QUIZ}, skipped=skipped)
+    assert written == len(rows)
+    assert [row["student_id"] for row in skipped] == ["s0", "s1"]
+    matrix = submission_export.answers_matrix(submission_export.open_export(path))
+    assert matrix[:2].tolist() == [[0, 0, 0], [0, 0, 0]]
+    assert matrix[4].tolist() == [ord("C"), 0, ord("A")]
+    assert matrix[2].tolist() == [ord("B"), ord("B"), 0]
+
+    skipped = []
+    submission_export.export_submissions(rows, path, {"q1": QUIZ, "q2": OTHER_QUIZ}, width=5, skipped=skipped)
+    assert [row["student_id"] for row in skipped] == ["s1"]
+    assert submission_export.answers_matrix(submission_export.open_export(path))[0].tolist() == [ord("B"), 0, 0, 0, ord("C")]
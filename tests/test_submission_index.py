@@ -0,0 +1,30 @@
+from submission_index import DISPLAY_FIELDS, SubmissionIndex
+from submission_store import SubmissionLog
+
+
+def submission(student_id, quiz_id, timestamp):
+    return {
+        "student_id": student_id,
+        "quiz_id": quiz_id,
+        "quiz_title": quiz_id.title(),
+        "answers": {"0": "A", "1": "B"},
+        "score": 1,
+        "total_questions": 2,
+        "submission_timestamp": timestamp,
+        "submission_time_str": f"t{timestamp}",
+    }
+
+
+def test_pages_hold_display_fields_only(tmp_path):
+    log = SubmissionLog(str(tmp_path / "log"))
+    log.append_many([submission("s1", "quiz_a", 1), submission("s2", "quiz_b", 3), submission("s1", "quiz_b", 2)])
+    index = SubmissionIndex(log)
+    assert index.refresh() == 3
+
+    page = index.page(0, 10)
+    assert [(sub["student_id"], sub["quiz_id"]) for sub in page] == [("s2", "quiz_b"), ("s1", "quiz_b"), ("s1", "quiz_a")]
+    assert all(set(sub) == set(DISPLAY_FIELDS) for sub in page)
+    assert index.count(quiz_id="quiz_b") == 2
+    assert index.page(0, 10, student_id="s1", quiz_id="quiz_b")[0]["submission_time_str"] == "t2"
+    assert index.quiz_ids() == ["quiz_a", "quiz_b"]
+    log.close()
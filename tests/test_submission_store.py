@@ -0,0 +1,37 @@
+import time
+
+from submission_store import SubmissionLog
+
+
+def record(i):
+    return {"quiz_id": "q1", "student_id": f"s{i}", "score": i, "submission_timestamp": float(i)}
+
+
+def test_append_and_read_since(tmp_path):
+    log = SubmissionLog(str(tmp_path / "log"))
+    log.append_many([record(0), record(1)])
+    records, cursor, reset = log.read_since()
+    assert reset and [r["score"] for r in records] == [0, 1]
+    log.append(record(2))
+    records, cursor, reset = log.read_since(cursor)
+    assert not reset and [r["score"] for r in records] == [2]
+    log.close()
+
+
+def test_unsynced_records_are_flushed_after_the_interval(tmp_path):
+    log = SubmissionLog(str(tmp_path / "log"), fsync_every=1000, fsync_interval=0.5)
+    log.append(record(0))
+    assert log._unsynced == 1 # Within the interval: left for the timer
+    deadline = time.monotonic() + 2
+    while log._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert log._unsynced == 0
+    log.close()
+
+
+def test_close_with_a_pending_flush(tmp_path):
+    log = SubmissionLog(str(tmp_path / "log"), fsync_every=1000, fsync_interval=0.05)
+    log.append_many([record(0), record(1)])
+    log.close()
+    time.sleep(0.1) # A cancelled or late timer must not touch the closed log
+    assert [r["score"] for r in SubmissionLog(str(tmp_path / "log")).read_all()] == [0, 1]